@@ -0,0 +1,83 @@
+"""
+Benchmark systems.algos.find_cycles on large graphs, to check that
+it scales linearly with the number of nodes and edges.
+
+Run from the repository root:
+
+    python3 benchmarks/bench_algos.py --nodes 100000
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import systems.algos
+
+
+def graph(nodes, edges_per_node, cycle=False, seed=0):
+    "Random graph where nodes only reference earlier nodes, unless cycle."
+    rand = random.Random(seed)
+    in_graph = {i: [] for i in range(nodes)}
+    out_graph = {i: [] for i in range(nodes)}
+    for i in range(1, nodes):
+        for _ in range(edges_per_node):
+            j = rand.randrange(0, i)
+            out_graph[i].append(j)
+            in_graph[j].append(i)
+    if cycle:
+        out_graph[0].append(nodes - 1)
+        in_graph[nodes - 1].append(0)
+    return in_graph, out_graph
+
+
+def timed(nodes, edges_per_node, cycle, repeat):
+    """
+    Best time of repeat runs of find_cycles, with garbage collection
+    disabled so collections triggered by the graph's size aren't
+    mistaken for the algorithm scaling worse than linearly.
+    """
+    in_graph, out_graph = graph(nodes, edges_per_node, cycle)
+    best = None
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            has_cycle, cycles, deps = systems.algos.find_cycles(in_graph, out_graph)
+            elapsed = time.perf_counter() - start
+            assert has_cycle == cycle
+            best = elapsed if best is None else min(best, elapsed)
+            del cycles, deps
+            gc.collect()
+    finally:
+        gc.enable()
+    return best
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument('--nodes', type=int, default=100000)
+    p.add_argument('--edges', type=int, default=2, help="edges per node")
+    p.add_argument('--repeat', type=int, default=3)
+    p.add_argument('--max-ratio', type=float, default=None,
+                   help="exit with an error if doubling nodes costs more than this many times as much")
+    args = p.parse_args()
+
+    sizes = [args.nodes // 4, args.nodes // 2, args.nodes]
+    for cycle in (False, True):
+        times = [timed(n, args.edges, cycle, args.repeat) for n in sizes]
+        label = "with cycle" if cycle else "acyclic"
+        for n, elapsed in zip(sizes, times):
+            print("%-10s nodes: %7d  %.3fs" % (label, n, elapsed))
+        ratio = max(times[1] / times[0], times[2] / times[1])
+        print("%-10s worst ratio when doubling nodes: %.2f" % (label, ratio))
+        if args.max_ratio is not None and ratio > args.max_ratio:
+            print("find_cycles is scaling worse than linearly")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
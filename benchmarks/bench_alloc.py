@@ -0,0 +1,111 @@
+"""
+Benchmark allocations while stepping a model, comparing State.advance
+against the previous approach of building a list of deferred changes
+every round and copying the state into a snapshot.
+
+Run from the repository root:
+
+    python3 benchmarks/bench_alloc.py --teams 500 --rounds 200
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import systems.models
+import systems.parse
+
+
+def synthetic_model(teams):
+    """
+    Model with a six step hiring funnel per team, where some steps'
+    maximums depend on the team's capacity, so stepping computes them.
+    """
+    lines = []
+    for t in range(teams):
+        lines.append("Team%d_Cap(%d)" % (t, 5 + t % 10))
+        lines.append("[Candidates%d] > Team%d_0 @ 5" % (t, t))
+        for i in range(5):
+            rate = ["0.5", "Leak(0.2)", "3"][i % 3]
+            maximum = "" if i % 2 else "(0, Team%d_Cap * %d)" % (t, i + 2)
+            lines.append("Team%d_%d > Team%d_%d%s @ %s" % (t, i, t, i + 1, maximum, rate))
+    return systems.parse.parse("\n".join(lines))
+
+
+def reference_advance(state, schedule):
+    "Advance state as State.advance did before reusing a pending buffer."
+    deferred = []
+    for group in schedule:
+        for flow in group:
+            source_state = state[flow.source.name]
+            destination_state = state[flow.destination.name]
+            rem_change, add_change = flow.change(state, source_state, destination_state)
+            state[flow.source.name] -= rem_change
+            deferred.append((flow.destination.name, add_change))
+
+    for dest, change in deferred:
+        state[dest] += change
+
+
+def measure(step, rounds):
+    """
+    Time step for rounds, and then count garbage collections and
+    peak traced memory for another rounds, as tracing slows stepping.
+    """
+    start = time.perf_counter()
+    for i in range(rounds):
+        step()
+    elapsed = time.perf_counter() - start
+
+    collections = sum(s['collections'] for s in gc.get_stats())
+    tracemalloc.start()
+    for i in range(rounds):
+        step()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    collections = sum(s['collections'] for s in gc.get_stats()) - collections
+    return elapsed, collections, peak
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument('--teams', type=int, default=500)
+    p.add_argument('--rounds', type=int, default=200)
+    p.add_argument('--max-collections', type=int, default=None,
+                   help="exit with an error if State.advance triggers more garbage collections")
+    args = p.parse_args()
+
+    model = synthetic_model(args.teams)
+    model.validate()
+
+    reference = systems.models.State(model)
+
+    def reference_step():
+        reference_advance(reference.state, model.schedule)
+        reference.snapshot()
+
+    state = systems.models.State(model)
+    results = [
+        ("reference", measure(reference_step, args.rounds)),
+        ("advance", measure(state.advance, args.rounds)),
+    ]
+    if reference.state != state.state:
+        print("states differ from reference")
+        sys.exit(1)
+
+    print("flows: %d, rounds: %d" % (len(model.flows), args.rounds))
+    for label, (elapsed, collections, peak) in results:
+        print("%-10s %.3fs  %5d collections  %8d bytes peak" % (label, elapsed, collections, peak))
+
+    collections = results[1][1][1]
+    if args.max_collections is not None and collections > args.max_collections:
+        print("State.advance triggered %d garbage collections" % collections)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
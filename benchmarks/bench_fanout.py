@@ -0,0 +1,61 @@
+"""
+Benchmark the numpy engine against the python engine on a model where
+one stock feeds many others, whose flows all remove from the same
+source and so must be applied one after another each round.
+
+Run from the repository root:
+
+    python3 benchmarks/bench_fanout.py --sinks 999 --rounds 1000
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import systems.parse
+
+
+def fanout_definition(sinks):
+    "Generate a definition where one source is split between sinks."
+    rows = ["[Supply] > Source(%d) @ %d" % (sinks * 3, sinks)]
+    for i in range(sinks):
+        rows.append("Source > Sink%d @ %s" % (i, [1, 2, 3, "0.5", "Leak(0.01)"][i % 5]))
+    return "\n".join(rows)
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument('--sinks', type=int, default=999)
+    p.add_argument('--rounds', type=int, default=1000)
+    p.add_argument('--repeat', type=int, default=3)
+    p.add_argument('--min-speedup', type=float, default=None,
+                   help="exit with an error if the numpy engine is not this many times faster")
+    args = p.parse_args()
+
+    try:
+        import numpy
+    except ImportError:
+        print("numpy is not installed, skipping")
+        return
+
+    model = systems.parse.parse(fanout_definition(args.sinks))
+    if model.run(args.rounds) != model.run(args.rounds, engine="numpy"):
+        print("numpy engine's results differ from python engine")
+        sys.exit(1)
+
+    python = min(timeit.repeat(lambda: model.run(args.rounds), number=1, repeat=args.repeat))
+    vectorized = min(timeit.repeat(lambda: model.run(args.rounds, engine="numpy"), number=1, repeat=args.repeat))
+    speedup = python / vectorized
+    print("sinks:   %d for %d rounds" % (args.sinks, args.rounds))
+    print("python:  %.3fs" % python)
+    print("numpy:   %.3fs" % vectorized)
+    print("speedup: %.1fx" % speedup)
+    if args.min_speedup is not None and speedup < args.min_speedup:
+        print("speedup is below %.1fx" % args.min_speedup)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
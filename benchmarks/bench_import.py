@@ -0,0 +1,64 @@
+"""
+Benchmark how long importing the command line tools takes, and check
+that they don't eagerly import modules only needed by some commands.
+
+Run from the repository root:
+
+    python3 benchmarks/bench_import.py --max-ms 100
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules which are only imported when they're used
+LAZY = ['argparse', 'traceback', 'pprint', 'graphviz', 'numpy', 'pickle', 'tempfile', 'concurrent.futures']
+MODULES = ['systems.cli', 'systems.parse', 'systems.viz', 'systems.format']
+
+
+def python(code, *flags):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.run([sys.executable, *flags, '-c', code], env=env, check=True,
+                          capture_output=True, text=True)
+
+
+def import_time(module):
+    "Microseconds to import module, including its imports, from -X importtime."
+    result = python("import %s" % module, '-X', 'importtime')
+    for line in result.stderr.splitlines():
+        parts = [p.strip() for p in line.split('|')]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise ValueError("no import time for %s" % module)
+
+
+def eager(module):
+    "Lazy modules which are imported anyway when importing module."
+    result = python("import sys, %s; print('\\n'.join(sys.modules))" % module)
+    loaded = set(result.stdout.split())
+    return [name for name in LAZY if name in loaded]
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument('--repeat', type=int, default=5)
+    p.add_argument('--max-ms', type=float, default=None,
+                   help="exit with an error if any module takes longer to import")
+    args = p.parse_args()
+
+    failed = False
+    for module in MODULES:
+        ms = min(import_time(module) for _ in range(args.repeat)) / 1000
+        imported = eager(module)
+        print("%-15s %6.1fms  %s" % (module, ms, "eagerly imports " + ", ".join(imported) if imported else ""))
+        if imported or (args.max_ms is not None and ms > args.max_ms):
+            failed = True
+    if failed:
+        print("import time or eager imports regressed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark systems.lexer.lex against the character-at-a-time lexer
+it replaced, using large synthetic model definitions.
+
+Run from the repository root:
+
+    python3 benchmarks/bench_lexer.py --lines 20000 --min-speedup 2
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import systems.lexer
+import reference_lexer
+
+
+def synthetic_definition(lines, seed=0):
+    "Generate a definition resembling generated hiring funnels."
+    rand = random.Random(seed)
+    rows = ["# generated definition"]
+    for i in range(lines - 1):
+        team = i // 6
+        step = i % 6
+        src = "[Candidates%d]" % team if step == 0 else "Team%d_Step%d" % (team, step)
+        dest = "Team%d_Step%d(%d, %d)" % (team, step + 1, rand.randint(0, 5), rand.randint(10, 100))
+        rate = rand.choice([
+            str(rand.randint(1, 30)),
+            "0.%d" % rand.randint(1, 9),
+            "Leak(0.%d)" % rand.randint(1, 9),
+            "Team%d_Step%d / (Recruiters + 1)" % (team, step),
+        ])
+        rows.append("%s > %s @ %s" % (src, dest, rate))
+    return "\n".join(rows)
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument('--lines', type=int, default=20000)
+    p.add_argument('--repeat', type=int, default=3)
+    p.add_argument('--min-speedup', type=float, default=None,
+                   help="exit with an error if lex is not this many times faster")
+    args = p.parse_args()
+
+    txt = synthetic_definition(args.lines)
+    if systems.lexer.lex(txt) != reference_lexer.lex(txt):
+        print("lexed tokens differ from reference lexer")
+        sys.exit(1)
+
+    reference = min(timeit.repeat(lambda: reference_lexer.lex(txt), number=1, repeat=args.repeat))
+    current = min(timeit.repeat(lambda: systems.lexer.lex(txt), number=1, repeat=args.repeat))
+    speedup = reference / current
+    print("lines:     %d" % args.lines)
+    print("reference: %.3fs (%d lines/s)" % (reference, args.lines / reference))
+    print("lex:       %.3fs (%d lines/s)" % (current, args.lines / current))
+    print("speedup:   %.1fx" % speedup)
+
+    if args.min_speedup is not None and speedup < args.min_speedup:
+        print("speedup is below %.1fx" % args.min_speedup)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark the memory used by a parsed model, comparing the slotted
+Stock, Flow, Rate and Formula classes against the size the same
+objects would have if their attributes were stored in a __dict__.
+
+Run from the repository root:
+
+    python3 benchmarks/bench_memory.py --teams 5000
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import systems.lexer
+import systems.parse
+import random
+
+
+def synthetic_definition(teams, seed=0):
+    "Generate a definition with a six step hiring funnel per team."
+    rand = random.Random(seed)
+    rows = ["Recruiters(3)"]
+    for team in range(teams):
+        rows.append("[Candidates%d] > Team%d_Step1(0, %d) @ %d" % (
+            team, team, rand.randint(10, 100), rand.randint(1, 30)))
+        for step in range(1, 6):
+            rate = rand.choice([
+                str(rand.randint(1, 30)),
+                "0.%d" % rand.randint(1, 9),
+                "Leak(0.%d)" % rand.randint(1, 9),
+                "Team%d_Step%d / (Recruiters + 1)" % (team, step),
+            ])
+            rows.append("Team%d_Step%d > Team%d_Step%d(%d, %d) @ %s" % (
+                team, step, team, step + 1, rand.randint(0, 5), rand.randint(10, 100), rate))
+    return "\n".join(rows)
+
+
+class Plain:
+    "Object with attributes stored in a __dict__, for comparison."
+
+
+def objects(model):
+    "Every Stock, Flow, Rate and Formula in model."
+    found = []
+    pending = []
+    for stock in model.stocks:
+        found.append(stock)
+        pending += [stock.initial, stock.maximum]
+    for flow in model.flows:
+        found += [flow, flow.rate]
+        pending.append(flow.rate.formula)
+    while pending:
+        formula = pending.pop()
+        found.append(formula)
+        pending += formula.children
+    return found
+
+
+def slots(obj):
+    return [name for cls in type(obj).__mro__ for name in getattr(cls, '__slots__', ())]
+
+
+def sizes(found):
+    "Bytes used by objects, and the bytes they'd use with a __dict__."
+    slotted = sum(sys.getsizeof(obj) for obj in found)
+    attributes = [[(name, getattr(obj, name)) for name in slots(obj)] for obj in found]
+    gc.collect()
+    tracemalloc.start()
+    plain = []
+    for attrs in attributes:
+        p = Plain()
+        for name, value in attrs:
+            setattr(p, name, value)
+        plain.append(p)
+    traced, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # the list holding the objects isn't part of their size
+    return slotted, traced - sys.getsizeof(plain)
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument('--teams', type=int, default=5000)
+    p.add_argument('--min-reduction', type=float, default=None,
+                   help="exit with an error if objects aren't this fraction smaller than with a __dict__")
+    args = p.parse_args()
+
+    txt = synthetic_definition(args.teams)
+    lines = txt.count("\n") + 1
+    systems.lexer.lex_formula.cache_clear()
+    gc.collect()
+    tracemalloc.start()
+    model = systems.parse.parse(txt, tracebacks=False)
+    traced, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    found = objects(model)
+    slotted, plain = sizes(found)
+    reduction = 1 - slotted / plain
+    print("lines:      %d" % lines)
+    print("objects:    %d" % len(found))
+    print("model:      %d bytes traced (%d bytes per line)" % (traced, traced / lines))
+    print("slotted:    %d bytes (%.1f per object)" % (slotted, slotted / len(found)))
+    print("__dict__:   %d bytes (%.1f per object)" % (plain, plain / len(found)))
+    print("reduction:  %.0f%%" % (reduction * 100))
+
+    if args.min_reduction is not None and reduction < args.min_reduction:
+        print("reduction is below %.0f%%" % (args.min_reduction * 100))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
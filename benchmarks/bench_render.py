@@ -0,0 +1,88 @@
+"""
+Benchmark writing results with Model.write and Model.write_html against
+building the whole output as a string, as Model.render did before.
+
+Run from the repository root:
+
+    python3 benchmarks/bench_render.py --stocks 500 --rounds 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import systems.parse
+
+
+def reference_render(model, results, sep='\t', pad=True):
+    "Render results by concatenating strings, as Model.render did."
+    col_stocks = [s for s in model.stocks if s.show]
+    header = sep[:]
+    header += sep.join([s.name for s in col_stocks])
+    col_size = [len(s.name) for s in col_stocks]
+    rows = [header]
+    for i, snapshot in enumerate(results):
+        row = "%s" % i
+        for j, col in enumerate(col_stocks):
+            num = str(snapshot[col.name])
+            if pad:
+                num = num.ljust(col_size[j])
+            row += sep[:] + num
+        rows.append(row)
+    return "\n".join(rows)
+
+
+def reference_render_html(model, results):
+    "Render results by concatenating strings, as Model.render_html did."
+    rows = ["<table>", "<theader>", "<tr>"]
+    col_stocks = [s for s in model.stocks if s.show]
+    rows += ["<td><strong>Round</strong></td>"]
+    rows += ["<td><strong>%s</strong></td>" % s.name for s in col_stocks]
+    rows += ["</tr>", "</theader>", "<tbody>"]
+    for i, snapshot in enumerate(results):
+        row = "<tr><td>%s</td>" % i
+        for j, col in enumerate(col_stocks):
+            row += "<td>%s</td>" % str(snapshot[col.name])
+        row += "</tr>"
+        rows.append(row)
+    rows += ["</tbody>", "</table>"]
+    return "\n".join(rows)
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument('--stocks', type=int, default=500)
+    p.add_argument('--rounds', type=int, default=5000)
+    args = p.parse_args()
+
+    lines = ["[Source] > Stock0 @ 3"]
+    lines += ["Stock%d > Stock%d @ Leak(0.5)" % (i, i + 1) for i in range(args.stocks - 1)]
+    model = systems.parse.parse(lines)
+    results = model.run(rounds=args.rounds)
+
+    with open(os.devnull, 'w') as out:
+        cases = [
+            ("padded", lambda: out.write(reference_render(model, results)),
+             lambda: model.write(results, out)),
+            ("csv", lambda: out.write(reference_render(model, results, sep=',', pad=False)),
+             lambda: model.write(results, out, sep=',', pad=False)),
+            ("html", lambda: out.write(reference_render_html(model, results)),
+             lambda: model.write_html(results, out)),
+        ]
+        print("stocks: %d, rounds: %d" % (args.stocks, args.rounds))
+        for label, reference, current in cases:
+            before = timed(reference)
+            after = timed(current)
+            print("%-7s reference %.3fs  write %.3fs  speedup %.1fx" % (label, before, after, before / after))
+
+
+if __name__ == "__main__":
+    main()
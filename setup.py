@@ -16,12 +16,16 @@ with open("README.md", "r") as fh:
                 install_requires=[
                         "graphviz",
                 ],
+                extras_require={
+                        "numpy": ["numpy"],
+                },
                 classifiers=[
                         "Programming Language :: Python :: 3",
                         "License :: OSI Approved :: MIT License",
                         "Operating System :: OS Independent",
                 ],
                 scripts=[
+                        "bin/systems",
                         "bin/systems-run",
                         "bin/systems-viz",
                         "bin/systems-lex",
@@ -2,21 +2,175 @@
 
 
 def find_cycles(in_graph, out_graph):
-    cycles = out_graph.copy()
+    """
+    Find an ordering of nodes where every node follows the nodes its
+    outgoing edges point to, using Kahn's algorithm.
+
+    Returns whether there's a cycle, the members of any cycles mapped to
+    their edges within their cycle, and the ordered nodes which have
+    outgoing edges. Neither graph is modified.
+    """
+    incoming = {node: len(edges) for node, edges in in_graph.items()}
+    queue = [node for node, count in incoming.items() if count == 0]
     deps = []
-    changed = True
-    while changed:
-        changed = False
-        for node, edges in cycles.items():
-            # if you have no incoming edges and do have outgoing edges,
-            # then trim those edges away
-            if in_graph[node] == [] and edges != []:
-                for edge in edges:
-                    in_graph[edge].remove(node)
-                    cycles[node] = []
-                deps.append(node)
-                changed = True
-
-    has_cycle = any([len(x) > 0 for x in cycles.values()])
+    while queue:
+        node = queue.pop()
+        edges = out_graph[node]
+        if edges:
+            deps.append(node)
+        for edge in edges:
+            incoming[edge] -= 1
+            if incoming[edge] == 0:
+                queue.append(edge)
+
+    remaining = {node for node, count in incoming.items() if count > 0}
+    cycles = {}
+    for component in find_strongly_connected(remaining, out_graph):
+        members = set(component)
+        for node in component:
+            edges = [edge for edge in out_graph[node] if edge in members]
+            if len(component) > 1 or edges:
+                cycles[node] = edges
+
+    has_cycle = len(cycles) > 0
     deps = list(reversed(deps))
     return has_cycle, cycles, deps
+
+
+def find_strongly_connected(nodes, out_graph):
+    """
+    Find strongly connected components of the subgraph of out_graph
+    made up of nodes, using an iterative version of Tarjan's algorithm.
+    """
+    index = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+    components = []
+    counter = 0
+
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(out_graph[root]))]
+        while work:
+            node, edges = work[-1]
+            for edge in edges:
+                if edge not in nodes:
+                    continue
+                if edge not in index:
+                    index[edge] = lowlink[edge] = counter
+                    counter += 1
+                    stack.append(edge)
+                    on_stack.add(edge)
+                    work.append((edge, iter(out_graph[edge])))
+                    break
+                elif edge in on_stack:
+                    lowlink[node] = min(lowlink[node], index[edge])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+def find_levels(accesses):
+    """
+    Group a sequence of operations into levels which can each be
+    evaluated as a batch while giving the same results as evaluating
+    the operations one at a time, in order.
+
+    Each access is a tuple of (reads, writes, appends) for an operation,
+    where writes are applied immediately and appends are deferred
+    until every operation has run. Within a level, every read happens
+    before any write. Returns the level of each operation.
+
+    Accesses may also include a fourth set of chained writes, which
+    the caller applies one after another within a level, so chained
+    writes to the same name can share a level, but nothing else may
+    read or write that name until the next level.
+    """
+    levels = []
+    written = {}
+    read = {}
+    appended = {}
+    chained = {}
+    for reads, writes, appends, *rest in accesses:
+        chains = rest[0] if rest else ()
+        level = 0
+        for name in reads:
+            if name in written:
+                level = max(level, written[name] + 1)
+            if name in chained:
+                level = max(level, chained[name] + 1)
+        for name in writes:
+            level = max(level, read.get(name, 0))
+            if name in written:
+                level = max(level, written[name] + 1)
+            if name in chained:
+                level = max(level, chained[name] + 1)
+        for name in appends:
+            level = max(level, appended.get(name, 0))
+        for name in chains:
+            level = max(level, read.get(name, 0), chained.get(name, 0))
+            if name in written:
+                level = max(level, written[name] + 1)
+
+        for name in reads:
+            read[name] = max(read.get(name, 0), level)
+        for name in writes:
+            written[name] = max(written.get(name, 0), level)
+        for name in appends:
+            appended[name] = max(appended.get(name, 0), level)
+        for name in chains:
+            chained[name] = max(chained.get(name, 0), level)
+        levels.append(level)
+    return levels
+
+
+def find_components(nodes):
+    """
+    Group operations which share any nodes, where nodes is a list
+    of the nodes touched by each operation. Returns lists of operation
+    indices, ordered by their first operation.
+    """
+    parents = {}
+
+    def find(node):
+        root = node
+        while parents[root] != root:
+            root = parents[root]
+        while parents[node] != root:
+            parents[node], node = root, parents[node]
+        return root
+
+    for touched in nodes:
+        first = None
+        for node in touched:
+            parents.setdefault(node, node)
+            if first is None:
+                first = find(node)
+            else:
+                root = find(node)
+                if root != first:
+                    parents[root] = first
+
+    groups = {}
+    for i, touched in enumerate(nodes):
+        key = find(next(iter(touched))) if touched else ('operation', i)
+        groups.setdefault(key, []).append(i)
+    return list(groups.values())
@@ -0,0 +1,138 @@
+"""
+Run many scenarios of one model together, without parsing the
+model again for each scenario.
+
+Each scenario is a dictionary of overrides, for example:
+
+    {
+        'initial': {'Employees': 10},
+        'maximum': {'Offers': 'Recruiters * 2'},
+        'rates': {'Candidates > PhoneScreens': 30},
+    }
+
+Values are anything accepted by Formula, and flows are identified
+by the names of their source and destination stocks.
+"""
+import concurrent.futures
+import copy
+
+import systems.models
+from systems.errors import InvalidOverride
+
+
+OVERRIDES = ('initial', 'maximum', 'rates')
+
+
+def flow_key(flow):
+    "Identify flow for rate overrides."
+    return "%s > %s" % (flow.source.name, flow.destination.name)
+
+
+def apply_overrides(model, overrides):
+    """
+    Copy model, replacing formulas specified in overrides. Formulas
+    which aren't overridden are shared with the original model.
+    """
+    for kind in overrides:
+        if kind not in OVERRIDES:
+            raise InvalidOverride(kind, ", ".join(overrides[kind]))
+    initial = overrides.get('initial', {})
+    maximum = overrides.get('maximum', {})
+    rates = overrides.get('rates', {})
+
+    names = {s.name for s in model.stocks}
+    for kind, values in (('initial', initial), ('maximum', maximum)):
+        for name in values:
+            if name not in names:
+                raise InvalidOverride(kind, name)
+    keys = {flow_key(f) for f in model.flows}
+    for key in rates:
+        if key not in keys:
+            raise InvalidOverride('rates', key)
+
+    m = systems.models.Model(model.name)
+    stocks = {}
+    for stock in model.stocks:
+        stocks[stock.name] = m.stock(
+            stock.name,
+            systems.models.Formula(initial[stock.name]) if stock.name in initial else stock.initial,
+            systems.models.Formula(maximum[stock.name]) if stock.name in maximum else stock.maximum,
+            show=stock.show)
+
+    for flow in model.flows:
+        rate = flow.rate
+        key = flow_key(flow)
+        if key in rates:
+            rate = copy.copy(rate)
+            rate.formula = systems.models.Formula(rates[key])
+        m.flow(stocks[flow.source.name], stocks[flow.destination.name], rate)
+    return m
+
+
+class BatchResults:
+    """
+    Results of running a batch of scenarios, where values is stacked
+    by scenario, round and stock. values is a numpy array when run
+    with the numpy engine, and nested lists otherwise.
+    """
+
+    def __init__(self, names, values):
+        self.names = names
+        self.values = values
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, scenario):
+        "Snapshots for scenario, in the same format as Model.run."
+        rows = self.values[scenario]
+        if hasattr(rows, 'tolist'):
+            rows = rows.tolist()
+        return [dict(zip(self.names, row)) for row in rows]
+
+    def stock(self, name):
+        "Values of stock for every round of every scenario."
+        i = self.names.index(name)
+        if hasattr(self.values, 'tolist'):
+            return self.values[:, :, i]
+        return [[row[i] for row in rows] for rows in self.values]
+
+
+def run_scenarios(models, rounds, engine, names):
+    "Run validated models, returning values stacked by scenario, round and stock."
+    if engine == "numpy":
+        import systems.vectorized
+        return systems.vectorized.simulate(models, rounds, names)[1]
+
+    values = []
+    for m in models:
+        snapshots = m.run(rounds=rounds, engine=engine)
+        values.append([[snapshot[name] for name in names] for snapshot in snapshots])
+    return values
+
+
+def run_batch(model, scenarios, rounds=10, engine=None, processes=None):
+    """
+    Run a scenario of model for each set of overrides in scenarios.
+
+    With processes, scenarios are split into one chunk per process,
+    and each chunk is run by a worker using engine.
+    """
+    models = [apply_overrides(model, overrides) for overrides in scenarios]
+    for m in models:
+        m.validate()
+
+    names = list(systems.models.State(models[0]).state) if models else []
+    if not processes or len(models) < 2:
+        return BatchResults(names, run_scenarios(models, rounds, engine, names))
+
+    size = -(-len(models) // processes)
+    chunks = [models[i:i+size] for i in range(0, len(models), size)]
+    n = len(chunks)
+    with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+        results = executor.map(run_scenarios, chunks, [rounds] * n, [engine] * n, [names] * n)
+        values = [scenario for chunk in results for scenario in chunk]
+    if engine == "numpy":
+        import numpy
+        values = numpy.stack(values)
+    return BatchResults(names, values)
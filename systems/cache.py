@@ -0,0 +1,129 @@
+"""
+Persistent cache of parsed models, keyed by a hash of their definition.
+
+Caching is opt-in, by passing a cache directory or by setting the
+SYSTEMS_CACHE_DIR environment variable. Entries are keyed by the
+package and Python versions along with the definition, so upgrading
+never loads a model pickled by another version. Entries are written
+atomically, and the least recently used are removed once the cache
+is larger than its maximum size.
+"""
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+
+import systems
+import systems.parse
+from systems.errors import SystemsException
+
+
+ENV_CACHE_DIR = 'SYSTEMS_CACHE_DIR'
+# maximum bytes of cached models, after which least recently used are removed
+MAX_SIZE = 256 * 2 ** 20
+SUFFIX = '.model'
+
+
+def cache_dir(path=None):
+    "Directory to cache models in, defaulting to SYSTEMS_CACHE_DIR if it's set."
+    return path or os.environ.get(ENV_CACHE_DIR) or None
+
+
+def key(txt):
+    "Key for a model definition, which changes with the package and Python versions."
+    digest = hashlib.sha256()
+    version = "%s %s %s.%s\n" % (systems.name, systems.version, *sys.version_info[:2])
+    digest.update(version.encode('utf-8'))
+    digest.update(txt.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def load(path):
+    "Load a cached model, returning None if it's missing or unreadable."
+    try:
+        with open(path, 'rb') as fin:
+            model = pickle.load(fin)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # corrupt or incompatible entries are replaced
+        remove(path)
+        return None
+    # mark as recently used for evict()
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return model
+
+
+def store(path, model):
+    "Store model at path, atomically so readers never see partial entries."
+    directory = os.path.dirname(path)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as fout:
+            pickle.dump(model, fout, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except BaseException:
+        remove(tmp)
+        raise
+
+
+def remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def evict(directory, max_size=MAX_SIZE):
+    "Remove least recently used entries until the cache is at most max_size bytes."
+    entries = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith(SUFFIX):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for mtime, size, path in sorted(entries):
+        if total <= max_size:
+            break
+        remove(path)
+        total -= size
+
+
+def parse(txt, directory=None, max_size=MAX_SIZE, tracebacks=True):
+    """
+    Parse txt, a string or iterable of lines, loading the model from
+    the cache in directory if it has been parsed before. Without a
+    directory, and when SYSTEMS_CACHE_DIR isn't set, this is the same
+    as systems.parse.parse.
+
+    Models are validated before they're cached, so loading them also
+    skips validation. Models which fail validation are cached anyway,
+    and raise the same error when they're run.
+    """
+    directory = cache_dir(directory)
+    if directory is None:
+        return systems.parse.parse(txt, tracebacks=tracebacks)
+    if not isinstance(txt, str):
+        txt = "".join(txt)
+
+    path = os.path.join(directory, key(txt) + SUFFIX)
+    model = load(path)
+    if model is not None:
+        return model
+
+    model = systems.parse.parse(txt, tracebacks=tracebacks)
+    try:
+        model.validate()
+    except SystemsException:
+        pass
+    os.makedirs(directory, exist_ok=True)
+    store(path, model)
+    evict(directory, max_size)
+    return model
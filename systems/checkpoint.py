@@ -0,0 +1,78 @@
+"""
+Compact binary checkpoints of a simulation's state, so that long runs
+can be saved and resumed later with identical results.
+
+A checkpoint is the MAGIC header, followed by the round and number of
+stocks, followed by each stock's name and value. Values are tagged by
+type, so integers and floats are restored exactly as they were saved.
+"""
+import struct
+
+from systems.errors import InvalidCheckpoint
+
+
+MAGIC = b'SYSCKPT1'
+HEADER = struct.Struct('<qI')
+NAME = struct.Struct('<H')
+INT = struct.Struct('<cq')
+FLOAT = struct.Struct('<cd')
+BIG_INT = struct.Struct('<cI')
+
+INT_MIN = -2 ** 63
+INT_MAX = 2 ** 63 - 1
+
+
+def dumps(round, state):
+    "Encode round and state, a mapping of stock names to values, as bytes."
+    parts = [MAGIC, HEADER.pack(round, len(state))]
+    for name, value in state.items():
+        encoded = name.encode('utf-8')
+        parts.append(NAME.pack(len(encoded)))
+        parts.append(encoded)
+        if type(value) is int:
+            if INT_MIN <= value <= INT_MAX:
+                parts.append(INT.pack(b'q', value))
+            else:
+                # integers are unbounded, and larger ones are rare
+                size = (value.bit_length() + 8) // 8
+                parts.append(BIG_INT.pack(b'n', size))
+                parts.append(value.to_bytes(size, 'little', signed=True))
+        else:
+            parts.append(FLOAT.pack(b'd', value))
+    return b''.join(parts)
+
+
+def loads(data):
+    "Decode bytes from dumps, returning the round and state."
+    if not data.startswith(MAGIC):
+        raise InvalidCheckpoint("missing header")
+    try:
+        offset = len(MAGIC)
+        round, count = HEADER.unpack_from(data, offset)
+        offset += HEADER.size
+        state = {}
+        for _ in range(count):
+            size, = NAME.unpack_from(data, offset)
+            offset += NAME.size
+            name = data[offset:offset+size].decode('utf-8')
+            offset += size
+            tag = data[offset:offset+1]
+            if tag == b'q':
+                _, value = INT.unpack_from(data, offset)
+                offset += INT.size
+            elif tag == b'd':
+                _, value = FLOAT.unpack_from(data, offset)
+                offset += FLOAT.size
+            elif tag == b'n':
+                _, size = BIG_INT.unpack_from(data, offset)
+                offset += BIG_INT.size
+                value = int.from_bytes(data[offset:offset+size], 'little', signed=True)
+                offset += size
+            else:
+                raise InvalidCheckpoint("unknown value type %r" % (tag,))
+            state[name] = value
+    except (struct.error, UnicodeDecodeError) as e:
+        raise InvalidCheckpoint("truncated or corrupt: %s" % (e,))
+    if offset != len(data):
+        raise InvalidCheckpoint("unexpected data after %s stocks" % (count,))
+    return round, state
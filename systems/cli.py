@@ -0,0 +1,48 @@
+"""
+Single entry point for the command line tools, as subcommands of
+systems, for example `systems run -r 10 < model.txt`.
+
+Only the module for the requested subcommand is imported, so that
+starting a command doesn't pay for importing the others.
+"""
+import importlib
+import sys
+
+
+COMMANDS = {
+    'run': ('systems.parse', "run a model, same as systems-run"),
+    'viz': ('systems.viz', "render a model as a graphviz diagram, same as systems-viz"),
+    'lex': ('systems.lexer', "print a model's lexed tokens, same as systems-lex"),
+    'fmt': ('systems.format', "format a model, same as systems-fmt"),
+}
+
+
+def usage():
+    lines = ["usage: systems <command> [options]", "", "commands:"]
+    for name, (_, description) in COMMANDS.items():
+        lines.append("  %-5s %s" % (name, description))
+    lines.append("")
+    lines.append("Use systems <command> --help for a command's options.")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    "Run the subcommand named by the first argument, returning an exit status."
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ('-h', '--help'):
+        print(usage())
+        return 0 if argv else 2
+    if argv[0] not in COMMANDS:
+        print("systems: unknown command '%s'\n\n%s" % (argv[0], usage()), file=sys.stderr)
+        return 2
+
+    command = argv[0]
+    module = importlib.import_module(COMMANDS[command][0])
+    # subcommands parse sys.argv, so they see only their own arguments
+    sys.argv = ["systems %s" % command] + argv[1:]
+    module.main()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
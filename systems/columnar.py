@@ -0,0 +1,187 @@
+"""
+Binary columnar files of results, which can be memory-mapped so that
+one stock's values can be read without reading or parsing the rest.
+
+A file starts with MAGIC, followed by the length of a JSON header
+as a little-endian unsigned 64 bit integer, followed by the header.
+The header has the stock names, the number of rounds, how rounds are
+numbered, the dtype of values and the offset of the first column. Columns are stored one
+after another from that offset, each holding a value for every round
+as a little-endian 64 bit float, so they can also be opened with
+numpy.memmap(path, dtype='<f8', offset=offset, shape=(stocks, rounds)).
+"""
+import itertools
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+from systems.errors import InvalidColumnarFile
+
+
+MAGIC = b'SYSCOLS1'
+HEADER_SIZE = struct.Struct('<Q')
+DTYPE = '<f8'
+# columns start on an aligned offset, for efficient memory-mapped access
+ALIGNMENT = 64
+
+
+# rounds of values buffered by write_snapshots before writing them to each column
+CHUNK = 4096
+
+
+def encode_header(names, rounds, every, start):
+    "Encode the start of a file up to its first column, returning it and the offset."
+    header = {'names': names, 'rounds': rounds, 'dtype': DTYPE,
+              'every': every, 'start': start}
+    prefix = len(MAGIC) + HEADER_SIZE.size
+    encoded = json.dumps(dict(header, offset=0)).encode('utf-8')
+    # the offset is included in the header, so leave room for its digits
+    offset = -(-(prefix + len(encoded) + 20) // ALIGNMENT) * ALIGNMENT
+    encoded = json.dumps(dict(header, offset=offset)).encode('utf-8')
+    encoded += b' ' * (offset - prefix - len(encoded))
+    return MAGIC + HEADER_SIZE.pack(len(encoded)) + encoded, offset
+
+
+def encode_values(values):
+    "Encode values as little-endian 64 bit floats."
+    if getattr(values, 'typecode', None) != 'd' or sys.byteorder != 'little':
+        values = array('d', values)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values.tobytes()
+
+
+def write(results, out, every=1, start=0):
+    """
+    Write Results to out, a file opened in binary mode. every and start
+    record how rounds are numbered, as in Model.render.
+    """
+    header, offset = encode_header(results.names, len(results), every, start)
+    out.write(header)
+    for column in results.columns:
+        out.write(encode_values(column.values))
+
+
+def write_snapshots(snapshots, rounds, out, every=1, start=0):
+    """
+    Write rounds snapshots, such as those from Model.iter_run, to out,
+    a seekable file opened in binary mode. The file is sized up front
+    and snapshots are written to their columns in chunks as they're
+    produced, so at most CHUNK rounds are held in memory.
+    """
+    snapshots = iter(snapshots)
+    first = next(snapshots, None)
+    names = list(first) if first is not None else []
+    header, offset = encode_header(names, rounds, every, start)
+    out.write(header)
+    out.truncate(offset + len(names) * rounds * 8)
+    if first is None:
+        snapshots = []
+    else:
+        snapshots = itertools.chain([first], snapshots)
+
+    buffers = [array('d') for _ in names]
+    written = flushed = 0
+
+    def flush():
+        for i, buffer in enumerate(buffers):
+            out.seek(offset + (i * rounds + flushed) * 8)
+            out.write(encode_values(buffer))
+            del buffer[:]
+
+    for snapshot in snapshots:
+        if written == rounds:
+            raise ValueError("expected %s rounds of snapshots, got more" % (rounds,))
+        for buffer, name in zip(buffers, names):
+            buffer.append(snapshot[name])
+        written += 1
+        if written - flushed == CHUNK:
+            flush()
+            flushed = written
+    flush()
+    if written != rounds:
+        raise ValueError("expected %s rounds of snapshots, got %s" % (rounds, written))
+
+
+def read_header(data):
+    "Read the header from the start of a columnar file's data."
+    if data[:len(MAGIC)] != MAGIC:
+        raise InvalidColumnarFile("missing header")
+    try:
+        size, = HEADER_SIZE.unpack_from(data, len(MAGIC))
+        start = len(MAGIC) + HEADER_SIZE.size
+        header = json.loads(bytes(data[start:start+size]).decode('utf-8'))
+        names, rounds, offset = header['names'], header['rounds'], header['offset']
+    except (struct.error, ValueError, KeyError) as e:
+        raise InvalidColumnarFile("unreadable header: %s" % (e,))
+    if header.get('dtype') != DTYPE:
+        raise InvalidColumnarFile("unsupported dtype %s" % (header.get('dtype'),))
+    if len(data) < offset + len(names) * rounds * 8:
+        raise InvalidColumnarFile("truncated, expected %s rounds of %s stocks" % (rounds, len(names)))
+    return header
+
+
+class ColumnarFile:
+    """
+    Memory-mapped results written by write, supporting the same
+    access by round and by column as Results, where every value is
+    a float. Columns are views of the file, and must be released
+    before closing it, or copied to keep them afterwards.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as fin:
+            try:
+                self.mmap = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:
+                raise InvalidColumnarFile(str(e))
+        try:
+            header = read_header(self.mmap)
+        except InvalidColumnarFile:
+            self.mmap.close()
+            raise
+        self.names = header['names']
+        self.rounds = header['rounds']
+        self.every = header.get('every', 1)
+        self.start = header.get('start', 0)
+        offset = header['offset']
+        self.index = {name: i for i, name in enumerate(self.names)}
+        size = len(self.names) * self.rounds * 8
+        self.values = memoryview(self.mmap)[offset:offset+size]
+        if sys.byteorder == 'little':
+            self.values = self.values.cast('d')
+
+    def column(self, name):
+        "Every round's value of stock, without reading any other stock."
+        i = self.index[name]
+        if sys.byteorder == 'little':
+            return self.values[i * self.rounds:(i + 1) * self.rounds]
+        values = array('d', self.values[i * self.rounds * 8:(i + 1) * self.rounds * 8])
+        values.byteswap()
+        return values
+
+    def __len__(self):
+        return self.rounds
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.rounds
+        if not 0 <= i < self.rounds:
+            raise IndexError("results index out of range")
+        return {name: self.column(name)[i] for name in self.names}
+
+    def __iter__(self):
+        for i in range(self.rounds):
+            yield self[i]
+
+    def close(self):
+        self.values.release()
+        self.mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -47,6 +47,58 @@ class FormulaError(IllegalSystemException):
         return "%s for formula '%s'" % (self.__class__.__name__, self.formula)
 
 
+class UnknownEngine(SystemsException):
+    "Specified simulation engine is unknown."
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def __str__(self):
+        return "engine '%s' is unknown, must be one of 'python' or 'numpy'" % (self.engine,)
+
+
+class UnknownModel(SystemsException):
+    "Requested model hash isn't known to the server."
+
+    def __init__(self, key):
+        self.key = key
+
+    def __str__(self):
+        return "model '%s' is unknown, send its definition instead" % (self.key,)
+
+
+class InvalidOverride(SystemsException):
+    "Override refers to a stock or flow which doesn't exist."
+
+    def __init__(self, kind, key):
+        self.kind = kind
+        self.key = key
+
+    def __str__(self):
+        return "%s override '%s' doesn't match any %s in the model" % (
+            self.kind, self.key, "flow" if self.kind == "rates" else "stock")
+
+
+class InvalidCheckpoint(SystemsException):
+    "Checkpoint can't be read, or doesn't match the model."
+
+    def __init__(self, reason):
+        self.reason = reason
+
+    def __str__(self):
+        return "invalid checkpoint: %s" % (self.reason,)
+
+
+class InvalidColumnarFile(SystemsException):
+    "File isn't a readable columnar file of results."
+
+    def __init__(self, reason):
+        self.reason = reason
+
+    def __str__(self):
+        return "invalid columnar file: %s" % (self.reason,)
+
+
 class CircularReferences(IllegalSystemException):
     def __init__(self, cycle, graph):
         self.cycle = cycle
@@ -6,9 +6,12 @@ import systems.lexer
 
 
 def main():
-    txt = sys.stdin.read()
-    lexed = systems.lexer.lex(txt)
-    print(systems.lexer.readable(lexed))
+    lines = 0
+    for line in systems.lexer.lex_lines(sys.stdin):
+        print(systems.lexer.readable(line))
+        lines += 1
+    if not lines:
+        print()
 
 
 if __name__ == "__main__":
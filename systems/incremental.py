@@ -0,0 +1,150 @@
+"""
+Rerun a model after editing it, only recomputing the stocks affected
+by the edit and reusing the previous results for every other stock.
+
+A stock is affected if its initial value changed, or if it's changed
+by a flow which was edited or which reads an affected stock. Affected
+stocks are recomputed by replaying only the flows which change them,
+along with flows that change the stocks those flows read during a
+round, with every other stock's value taken from the previous results
+at the start of each round.
+"""
+import systems.models
+from systems.results import Results
+
+
+def stock_signature(stock):
+    return (stock.initial.lexed, stock.initial.default, stock.maximum.lexed, stock.maximum.default)
+
+
+def flow_signature(flow):
+    return (type(flow.rate), flow.rate.formula.lexed, flow.rate.formula.default)
+
+
+def structure(model):
+    "Stocks and flows of model, which must match to reuse results."
+    return ([s.name for s in model.stocks],
+            [(f.source.name, f.destination.name) for f in model.flows])
+
+
+class Incremental:
+    """
+    Run a model repeatedly as it's edited, where each run only
+    recomputes the stocks affected by edits since the last run.
+
+    Adding or removing stocks or flows, or changing the number of
+    rounds, reruns the whole model.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.results = None
+        self.rounds = None
+        self.structure = None
+        self.stocks = None
+        self.flows = None
+        # stocks recomputed by the most recent run, or None
+        # when every stock was
+        self.affected = None
+
+    def run(self, rounds=10):
+        "Run the model, returning the same Results as Model.run."
+        model = self.model
+        model.validate()
+        current = structure(model)
+        stocks = {name: stock_signature(s) for name, s in model.stocks_by_name.items()}
+        flows = [flow_signature(f) for f in model.flows]
+
+        if self.results is None or rounds != self.rounds or current != self.structure:
+            results = model.run(rounds=rounds)
+            self.affected = None
+        else:
+            initials = {n for n in stocks if stocks[n][:2] != self.stocks[n][:2]}
+            maximums = {n for n in stocks if stocks[n][2:] != self.stocks[n][2:]}
+            edited = {f for f, before, after in zip(model.flows, self.flows, flows) if before != after}
+            edited.update(f for f in model.flows if f.destination.name in maximums)
+            self.affected = self.find_affected(initials, edited)
+            results = self.rerun(self.affected, rounds)
+
+        self.results = results
+        self.rounds = rounds
+        self.structure = current
+        self.stocks = stocks
+        self.flows = flows
+        return results
+
+    def find_affected(self, initials, edited):
+        """
+        Find the names of stocks whose values may have changed, given
+        the names of stocks with edited initial values and edited flows.
+        """
+        model = self.model
+        # initial values which reference a changed initial value change too
+        affected = set()
+        pending = list(initials)
+        while pending:
+            name = pending.pop()
+            if name not in affected:
+                affected.add(name)
+                pending += [s.name for s in model.stocks if name in s.initial.refs]
+
+        accesses = [(f, f.accesses()) for f in model.flows]
+        done = set()
+        changed = True
+        while changed:
+            changed = False
+            for flow, (reads, writes, appends) in accesses:
+                if flow not in done and (flow in edited or reads & affected):
+                    done.add(flow)
+                    affected |= writes | appends
+                    changed = True
+        return affected
+
+    def find_replay(self, affected):
+        """
+        Find flows which must be replayed to recompute affected stocks,
+        and the names of unaffected stocks they read.
+        """
+        model = self.model
+        accesses = {f: f.accesses() for f in model.flows}
+        replay = set()
+        needed = set(affected)
+        changed = True
+        while changed:
+            changed = False
+            for flow, (reads, writes, appends) in accesses.items():
+                if flow in replay:
+                    continue
+                if flow.source.name in needed or flow.destination.name in affected:
+                    replay.add(flow)
+                    needed |= reads | writes | appends
+                    changed = True
+        return replay, needed - affected
+
+    def rerun(self, affected, rounds):
+        "Recompute affected stocks, reusing the previous results for other stocks."
+        model = self.model
+        previous = self.results
+        if not affected:
+            return previous
+
+        replay, unaffected = self.find_replay(affected)
+        flows = [f for group in model.schedule for f in group if f in replay]
+        initial = systems.models.State(model).state
+        state = {name: initial[name] for name in initial if name in affected or name in unaffected}
+        reused = [(name, previous.columns[previous.index[name]]) for name in unaffected]
+
+        recomputed = Results(name for name in previous.names if name in affected)
+        recomputed.append(state)
+        steps = systems.models.flatten_schedule([flows])
+        pending = [0] * len(steps)
+        for i in range(1, rounds + 1):
+            systems.models.advance_steps(state, steps, pending)
+            recomputed.append(state)
+            for name, column in reused:
+                state[name] = column[i]
+
+        columns = [recomputed.columns[recomputed.index[name]] if name in affected
+                   else previous.columns[previous.index[name]]
+                   for name in previous.names]
+        return Results.from_columns(previous.names, columns)
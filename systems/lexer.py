@@ -1,6 +1,6 @@
+import functools
 import re
 import sys
-import pprint
 import systems.errors
 
 
@@ -37,6 +37,20 @@ LEGAL_STOCK_NAME = '[a-zA-Z][a-zA-Z0-9_]*'
 PARAM_WHOLE = '\-?[0-9]+'
 PARAM_DECIMAL = '[0-9]+\.[0-9]+'
 OPERATIONS = '[\/\+\-\*]'
+OPERATORS = ('/', '+', '-', '*')
+
+LEGAL_STOCK_NAME_RE = re.compile(LEGAL_STOCK_NAME)
+PARAM_WHOLE_RE = re.compile(PARAM_WHOLE)
+PARAM_DECIMAL_RE = re.compile(PARAM_DECIMAL)
+
+# number of distinct formula texts to keep lexed in lex_formula's cache
+FORMULA_CACHE_SIZE = 4096
+
+# chunks of formulas: parens, operations, runs of whitespace, or values
+FORMULA_CHUNKS = re.compile(r'[()/+*-]|[ \n]+|[^()/+*\- \n]+')
+FORMULA_SEPARATORS = re.compile(r'[()/+*\- \n]')
+# characters which determine how a line is lexed
+LINE_SPECIAL = re.compile('[>@#]')
 
 
 def lex_value(txt):
@@ -44,41 +58,58 @@ def lex_value(txt):
     txt = txt.strip()
     if txt == INFINITY:
         return (TOKEN_INFINITY, txt)
-    elif re.fullmatch(PARAM_WHOLE, txt):
+    elif PARAM_WHOLE_RE.fullmatch(txt):
         return (TOKEN_WHOLE, txt)
-    elif re.fullmatch(PARAM_DECIMAL, txt):
+    elif PARAM_DECIMAL_RE.fullmatch(txt):
         return (TOKEN_DECIMAL, txt)
     else:
-        return (TOKEN_REFERENCE, txt)
+        # references to a stock share one copy of its name
+        return (TOKEN_REFERENCE, sys.intern(txt))
 
 
+@functools.lru_cache(maxsize=FORMULA_CACHE_SIZE)
 def lex_formula(txt):
+    """
+    Lex a formula.
+
+    Lexed formulas are cached by their text, so the returned tokens are
+    shared and must not be modified. Use lex_formula.cache_info() for
+    the cache's hit and miss counts.
+    """
+    txt = txt.strip()
+    if not FORMULA_SEPARATORS.search(txt):
+        # a single value, which is by far the most common formula
+        return (TOKEN_FORMULA, [lex_value(txt)] if txt else [])
+
     groups = []
     tokens = []
     acc = ""
-    for c in txt.strip() + NEWLINE:
-        if c == START_PAREN:
+    for match in FORMULA_CHUNKS.finditer(txt):
+        chunk = match.group(0)
+        if chunk == START_PAREN:
             groups.append(tokens)
             tokens = []
-        elif c == END_PAREN:
+        elif chunk == END_PAREN:
             if acc:
                 tokens.append(lex_value(acc))
             acc = ""
             prev_tokens = groups.pop()
             prev_tokens.append((TOKEN_FORMULA, tokens))
             tokens = prev_tokens
-        elif c in (WHITESPACE, NEWLINE):
+        elif chunk[0] in (WHITESPACE, NEWLINE):
             if acc:
                 tokens.append(lex_value(acc))
             acc = ""
-        elif re.fullmatch(OPERATIONS, c):
+        elif chunk in OPERATORS:
             if acc:
                 tokens.append(lex_value(acc))
                 acc = ""
-            tokens.append((TOKEN_OP, c))
+            tokens.append((TOKEN_OP, chunk))
         else:
-            acc += c
+            acc += chunk
 
+    if acc:
+        tokens.append(lex_value(acc))
     return (TOKEN_FORMULA, tokens)
 
 
@@ -94,11 +125,11 @@ def lex_parameters(txt):
 
 def lex_caller(token, txt):
     txt = txt.strip()
-    match = re.match(LEGAL_STOCK_NAME, txt)
+    match = LEGAL_STOCK_NAME_RE.match(txt)
     if not match:
         raise systems.errors.IllegalStockName(txt, LEGAL_STOCK_NAME)
 
-    name = match.group(0)
+    name = sys.intern(match.group(0))
     rest = txt[match.end(0):]
 
     if rest != "" and not (rest.startswith(START_PARAMETER_SET) and rest.endswith(END_PARAMETER_SET)):
@@ -110,7 +141,7 @@ def lex_caller(token, txt):
 def lex_stock(txt):
     txt = txt.strip()
     if txt.startswith(START_INFINITE_STOCK) and txt.endswith(END_INFINITE_STOCK):
-        return (TOKEN_STOCK_INFINITE, txt[1:-1], (TOKEN_PARAMS, []))
+        return (TOKEN_STOCK_INFINITE, sys.intern(txt[1:-1]), (TOKEN_PARAMS, []))
     else:
         return lex_caller(TOKEN_STOCK, txt)
 
@@ -123,70 +154,63 @@ def lex_flow(txt):
 
     txt = txt.strip()
 
-    match = re.match(LEGAL_STOCK_NAME, txt)
+    match = LEGAL_STOCK_NAME_RE.match(txt)
     if match and txt[len(match.group(0)):].startswith(START_PARAMETER_SET) and txt.endswith(END_PARAMETER_SET):
         return lex_caller(TOKEN_FLOW, txt)
     else:
         return (TOKEN_FLOW, '', lex_parameters('('+txt+')'))
 
 
-def lex(txt):
-    # to eliminate edge cases, every txt starts with
-    # a whitespace and ends with a newline
-    txt = " " + txt + "\n"
+def lex_line(txt):
+    """
+    Lex a single line into its tokens.
+
+    Whitespace is ignored everywhere other than comments, and a line
+    is a comment if it has a COMMENT before any FLOW_DIRECTION or
+    FLOW_DELIMITER.
+    """
+    special = LINE_SPECIAL.search(txt)
+    if special and special.group(0) == COMMENT:
+        start = special.start()
+        return [(TOKEN_COMMENT, txt[:start].replace(WHITESPACE, "") + txt[start:])]
 
-    tokens = []
     line = []
-    char_buff = txt[0]
-    parsing = TOKEN_STOCK
-
-    line_num = 0
-    for c in txt[1:]:
-        prev = char_buff[-1]
-        if c == COMMENT and not line:
-            parsing = TOKEN_COMMENT
-        elif parsing == TOKEN_COMMENT:
-            if c == NEWLINE:
-                line.append((TOKEN_COMMENT, char_buff[1:]))
-                char_buff = WHITESPACE
-        elif parsing == TOKEN_STOCK:
-            if c == FLOW_DIRECTION:
-                # if you encounter a flow_direction, you must encounter a flow
-                line.append(lex_stock(char_buff))
-                line.append((TOKEN_FLOW_DIRECTION, c))
-                c = WHITESPACE
-                char_buff = WHITESPACE
-                parsing = TOKEN_STOCK
-            if c == FLOW_DELIMITER:
-                line.append(lex_stock(char_buff))
-                line.append((TOKEN_FLOW_DELIMITER, c))
-                c = WHITESPACE
-                char_buff = WHITESPACE
-                parsing = TOKEN_FLOW
-            elif c == NEWLINE:
-                if char_buff != WHITESPACE:
-                    line.append(lex_stock(char_buff))
-                char_buff = WHITESPACE
-        elif parsing == TOKEN_FLOW:
-            if c == NEWLINE:
-                if char_buff != WHITESPACE:
-                    line.append(lex_flow(char_buff))
-                char_buff = WHITESPACE
-
-        if c == NEWLINE:
-            line_num += 1
-            if char_buff != WHITESPACE:
-                raise Exception("unused char_buff: %s" % char_buff)
-            if line:
-                tokens.append((TOKEN_LINE, line_num, line))
-            line = []
-            parsing = TOKEN_STOCK
-            char_buff = WHITESPACE
-        elif c in (WHITESPACE, FLOW_DIRECTION) and not parsing == TOKEN_COMMENT:
-            continue
-        else:
-            char_buff += c
-    return (TOKEN_LINES, tokens)
+    delimiter = txt.find(FLOW_DELIMITER)
+    stocks = txt if delimiter == -1 else txt[:delimiter]
+    segments = stocks.split(FLOW_DIRECTION)
+    for segment in segments[:-1]:
+        # if you encounter a flow_direction, you must encounter a flow
+        line.append(lex_stock(segment.replace(WHITESPACE, "")))
+        line.append((TOKEN_FLOW_DIRECTION, FLOW_DIRECTION))
+
+    last = segments[-1].replace(WHITESPACE, "")
+    if delimiter == -1:
+        if last:
+            line.append(lex_stock(last))
+    else:
+        line.append(lex_stock(last))
+        line.append((TOKEN_FLOW_DELIMITER, FLOW_DELIMITER))
+        flow = txt[delimiter+1:].replace(WHITESPACE, "").replace(FLOW_DIRECTION, "")
+        if flow:
+            line.append(lex_flow(flow))
+    return line
+
+
+def lex_lines(lines):
+    """
+    Lex an iterable of lines, such as an open file, yielding a TOKEN_LINE
+    for each line with tokens as it's read. Trailing newlines are ignored.
+    """
+    for line_num, txt_line in enumerate(lines, 1):
+        if txt_line.endswith(NEWLINE):
+            txt_line = txt_line[:-1]
+        line = lex_line(txt_line)
+        if line:
+            yield (TOKEN_LINE, line_num, line)
+
+
+def lex(txt):
+    return (TOKEN_LINES, list(lex_lines(txt.split(NEWLINE))))
 
 
 def readable(token, class_str=None):
@@ -224,6 +248,7 @@ def readable(token, class_str=None):
 
 
 def main():
+    import pprint
     txt = sys.stdin.read()
     lexed = lex(txt)
     pprint.pprint(lexed)
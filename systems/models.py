@@ -7,20 +7,80 @@ instead, which don't require you to create so many Formula
 instances for parameters.
 """
 import math
+import operator
 
-from systems.errors import IllegalSourceStock, InvalidFormula
+from systems.errors import IllegalSourceStock, InvalidCheckpoint, InvalidFormula, UnknownEngine
+from systems.results import Results
 import systems.lexer
 import systems.algos
 
 DEFAULT_MAXIMUM = float("+inf")
 
 
+OPERATIONS = {
+    '/': operator.truediv,
+    '*': operator.mul,
+    '+': operator.add,
+    '-': operator.sub,
+}
+
+
+def _compile_value(token, children):
+    """
+    Compile a single value token into a function of state.
+
+    Nested formulas are built and validated once, and appended
+    to children so they can be inspected later.
+    """
+    kind, val_str = token
+    if kind == systems.lexer.TOKEN_WHOLE:
+        val = int(val_str)
+    elif kind == systems.lexer.TOKEN_INFINITY:
+        val = float('+inf')
+    elif kind == systems.lexer.TOKEN_DECIMAL:
+        val = float(val_str)
+    elif kind == systems.lexer.TOKEN_REFERENCE:
+        return operator.itemgetter(val_str)
+    elif kind == systems.lexer.TOKEN_FORMULA:
+        child = Formula(token)
+        children.append(child)
+        evaluator = child.evaluator
+        default = child.default
+        # equivalent to child.compute(state) without the per-call overhead
+        return lambda state: evaluator(state) or default
+    else:
+        raise Exception("This should be unreachable")
+    return lambda state: val
+
+
+def _compile_operations(first, operations):
+    """
+    Compile applying each of operations, pairs of an operator function
+    and an evaluator, in order to the result of first. Operations are
+    applied in a loop rather than nesting closures, so long formulas
+    don't recurse once per term.
+    """
+    if not operations:
+        return first
+    if len(operations) == 1:
+        (func, right), = operations
+        return lambda state: func(first(state), right(state))
+
+    def evaluate(state):
+        acc = first(state)
+        for func, right in operations:
+            acc = func(acc, right(state))
+        return acc
+    return evaluate
+
+
 class Formula:
     """
     Formulas are the core unit of computation in models,
     and are also serve as the interface between lexed formula
     definitions and the underlying models.
     """
+    __slots__ = ('lexed', 'default', 'children', 'evaluator', 'refs', 'constant', 'value')
 
     def __init__(self, definition, default=0):
         if type(definition) is str:
@@ -31,6 +91,14 @@ class Formula:
         self.lexed = definition
         self.default = default
         self.validate()
+        self.children = []
+        self.evaluator = self.compile()
+        self.refs = self.find_references()
+        self.fold()
+
+    def __reduce__(self):
+        "Compiled evaluators can't be pickled, so are rebuilt when unpickled."
+        return (_unpickle_formula, (self.lexed, self.default))
 
     def validate(self):
         "Ensure formula is mathematically coherent."
@@ -53,53 +121,57 @@ class Formula:
             if prev_kind == systems.lexer.TOKEN_OP:
                 raise InvalidFormula(self, "formula cannot end with an operation")
 
-    def references(self):
-        "Return list of all references in formula."
+    def find_references(self):
+        "Find all references in formula, including nested formulas."
         refs = []
         if type(self.lexed) in (list, tuple):
             for kind, val in self.lexed[1]:
                 if kind == systems.lexer.TOKEN_REFERENCE:
                     refs.append(val)
+        for child in self.children:
+            refs += child.references()
         return refs
 
-    def compute(self, state=None):
-        if state is None:
-            state = {}
+    def references(self):
+        "Return list of all references in formula."
+        return list(self.refs)
 
-        acc = None
-        op = None
+    def fold(self):
+        """
+        Classify the formula as constant or state-dependent, computing
+        constant formulas once rather than every time they're used.
+        """
+        self.constant = False
+        self.value = None
+        if not self.refs:
+            try:
+                self.value = self.evaluator({}) or self.default
+                self.constant = True
+            except ZeroDivisionError:
+                # leave the error to be raised when computed
+                pass
+
+    def compile(self):
+        """
+        Compile the lexed tokens into a single evaluator, converting
+        literals once so that computing only pays for arithmetic.
+        """
         _, tokens = self.lexed
+        # validate() has already ensured that this is a legal formula,
+        # alternating between values and operations
+        first = _compile_value(tokens[0], self.children)
+        operations = [
+            (OPERATIONS[tokens[i][1]], _compile_value(tokens[i+1], self.children))
+            for i in range(1, len(tokens), 2)]
+        return _compile_operations(first, operations)
 
-        # validate() has already ensured that this is a legal formula
-        for token in tokens:
-            kind, val_str = token
-            if kind == systems.lexer.TOKEN_OP:
-                op = val_str
-                continue
-            if kind == systems.lexer.TOKEN_WHOLE:
-                val = int(val_str)
-            elif kind == systems.lexer.TOKEN_INFINITY:
-                val = float('+inf')
-            elif kind  == systems.lexer.TOKEN_DECIMAL:
-                val = float(val_str)
-            elif kind == systems.lexer.TOKEN_REFERENCE:
-                val = state[val_str]
-            elif kind == systems.lexer.TOKEN_FORMULA:
-                val = Formula(token).compute(state)
-            else:
-                Exception("This should be unreachable")
-
-            if acc is None:
-                acc = val
-            elif op == '/':
-                acc = acc / val
-            elif op == '*':
-                acc = acc * val
-            elif op == '+':
-                acc = acc + val
-            elif op == '-':
-                acc = acc - val
+    def compute(self, state=None):
+        if self.constant:
+            return self.value
+        if state is None:
+            state = {}
 
+        acc = self.evaluator(state)
         if acc:
             return acc
         return self.default
@@ -112,36 +184,124 @@ class Formula:
             return "F(%s)" % systems.lexer.readable(self.lexed)
 
 
+# formulas rebuilt by _unpickle_formula, keyed by their lexed tokens
+_UNPICKLED = {}
+
+
+def _unpickle_formula(lexed, default):
+    """
+    Rebuild a pickled formula. Formulas aren't modified once they're
+    built, so identical formulas are shared rather than compiled again,
+    which is most of the cost of loading a pickled model.
+    """
+    key = (repr(lexed), default)
+    formula = _UNPICKLED.get(key)
+    if formula is None:
+        if len(_UNPICKLED) >= systems.lexer.FORMULA_CACHE_SIZE:
+            _UNPICKLED.clear()
+        formula = _UNPICKLED[key] = Formula(lexed, default)
+    return formula
+
+
 class Stock(object):
+    __slots__ = ('model', 'name', '_initial', '_maximum', 'show')
+
     def __init__(self, name, initial=None, maximum=None, show=True):
+        # model is set by Model.add_stock, and is notified when
+        # initial or maximum are replaced
+        self.model = None
         self.name = name
         self.initial = initial if initial else Formula(0)
         self.maximum = maximum if maximum else Formula(float("+inf"))
         self.show = show
 
+    @property
+    def initial(self):
+        return self._initial
+
+    @initial.setter
+    def initial(self, formula):
+        self._initial = formula
+        if self.model is not None:
+            self.model.changed()
+
+    @property
+    def maximum(self):
+        return self._maximum
+
+    @maximum.setter
+    def maximum(self, formula):
+        self._maximum = formula
+        if self.model is not None:
+            self.model.changed()
+
+    def __getstate__(self):
+        "Stocks are pickled without their model, to avoid pickling every other stock."
+        state = {name: getattr(self, name) for name in self.__slots__}
+        state['model'] = None
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
     def __repr__(self):
         return "%s(%s)" % (self.__class__.__name__, self.name)
 
 
 class Flow(object):
+    __slots__ = ('source', 'destination', 'rate', 'maximum')
+
     def __init__(self, source, destination, rate):
         self.source = source
         self.destination = destination
         self.rate = rate
         self.rate.validate_source(self.source)
+        self.prepare()
+
+    def prepare(self):
+        """
+        Prepare to compute the destination's maximum, which is folded
+        when it's constant. Called again by Model.validate, as the
+        destination's maximum may have been replaced.
+        """
+        self.maximum = self.destination.maximum
+
+    def capacity(self, state):
+        "Compute the destination's maximum."
+        maximum = self.maximum
+        if maximum.constant:
+            return maximum.value
+        return maximum.compute(state)
 
     def change(self, state, source_state, dest_state):
-        capacity = self.destination.maximum.compute(state)
+        capacity = self.capacity(state)
         if dest_state != float('+inf'):
             capacity -= dest_state
         return self.rate.calculate(state, source_state, dest_state, capacity)
 
+    def accesses(self):
+        """
+        Return the names of stocks read, written and appended to by change().
+
+        The destination is only read to determine its remaining capacity,
+        so it isn't a dependency when its maximum is a constant infinity.
+        """
+        reads = [self.source.name] + self.rate.formula.references()
+        maximum = self.destination.maximum
+        max_refs = maximum.references()
+        if not maximum.constant or maximum.value != DEFAULT_MAXIMUM:
+            reads += [self.destination.name] + max_refs
+        return set(reads), {self.source.name}, {self.destination.name}
+
     def __repr__(self):
         return "%s(%s to %s at %s)" % (self.__class__.__name__,
                                        self.source, self.destination, self.rate)
 
 
 class Rate(object):
+    __slots__ = ('formula',)
+
     def __init__(self, formula):
         self.formula = Formula(formula)
 
@@ -163,6 +323,7 @@ class Rate(object):
 
 class Conversion(Rate):
     "Converts a stock into another at a discount rate."
+    __slots__ = ()
 
     def calculate(self, state, src, dest, capacity):
         evaluated = self.formula.compute(state)
@@ -183,6 +344,7 @@ class Conversion(Rate):
 
 class Leak(Conversion):
     "A stock leaks a percentage of its value into another."
+    __slots__ = ()
 
     def calculate(self, state, src, dest, capacity):
         evaluated = self.formula.compute(state)
@@ -192,37 +354,97 @@ class Leak(Conversion):
         return change, change
 
 
+def flatten_schedule(schedule):
+    """
+    Flatten groups of flows in schedule into steps of each flow along with
+    the names of its source and destination, which are built once and then
+    reused by advance_steps every round.
+    """
+    return [(flow, flow.source.name, flow.destination.name) for group in schedule for flow in group]
+
+
+def advance_steps(state, steps, pending):
+    """
+    Advance state, a mapping of stock names to values, by one round of
+    steps from flatten_schedule. pending must have a slot for every step,
+    and holds each flow's addition to its destination until every flow
+    has been evaluated, so stepping doesn't allocate any containers.
+    """
+    for i, (flow, source, destination) in enumerate(steps):
+        rem_change, pending[i] = flow.change(state, state[source], state[destination])
+        state[source] -= rem_change
+
+    for i, (flow, source, destination) in enumerate(steps):
+        state[destination] += pending[i]
+
+
+def steady(previous, current, tolerance=0):
+    "Whether every value in current is within tolerance of previous."
+    for a, b in zip(previous, current):
+        if a != b and not abs(a - b) <= tolerance:
+            return False
+    return True
+
+
 class State(object):
     def __init__(self, model):
         self.model = model
+        # steps and the initial path are built when validating
+        self.model.validate()
         self.state = {}
+        # number of rounds the state has been advanced
+        self.round = 0
+        initial_path = set(self.model.initial_path)
         for stock in self.model.stocks:
-            if stock.name not in self.model.initial_path:
+            if stock.name not in initial_path:
                 self.state[stock.name] = stock.initial.compute(self.state)
         for name in self.model.initial_path:
             self.state[name] = self.model.get_stock(name).initial.compute(self.state)
+        self.prepare()
+
+    def prepare(self):
+        "Build the steps and buffer used to advance each round."
+        self.steps = flatten_schedule(self.model.schedule)
+        self.pending = [0] * len(self.steps)
 
     def advance(self):
-        deferred = []
-
-        # HACK: in general better to defer starting at end of list
-        # then moving forward to support better pipelining,
-        # but it's only by convention that earlier things would
-        # be declaed earlier, so this is a weak heuristic at best.
-        # would be better to anaylze the graph
-        for flow in reversed(self.model.flows):
-            source_state = self.state[flow.source.name]
-            destination_state = self.state[flow.destination.name]
-            rem_change, add_change = flow.change(self.state, source_state, destination_state)
-            self.state[flow.source.name] -= rem_change
-            deferred.append((flow.destination.name, add_change))
-
-        for dest, change in deferred:
-            self.state[dest] += change
+        advance_steps(self.state, self.steps, self.pending)
+        self.round += 1
 
     def snapshot(self):
         return self.state.copy()
 
+    def checkpoint(self):
+        "Save the current round and values as bytes, which can be passed to State.restore."
+        import systems.checkpoint
+        return systems.checkpoint.dumps(self.round, self.state)
+
+    @classmethod
+    def restore(cls, model, data):
+        """
+        Restore a State of model from a checkpoint, which continues
+        exactly as the checkpointed State would have.
+        """
+        import systems.checkpoint
+        round, values = systems.checkpoint.loads(data)
+        model.validate()
+        names = [s.name for s in model.stocks]
+        if set(values) != set(names):
+            missing = sorted(set(names) - set(values))
+            extra = sorted(set(values) - set(names))
+            raise InvalidCheckpoint("stocks don't match model, missing %s and unexpected %s" % (missing, extra))
+
+        # same order as State.__init__, as results are ordered by stock
+        initial_path = set(model.initial_path)
+        order = [name for name in names if name not in initial_path] + model.initial_path
+
+        state = cls.__new__(cls)
+        state.model = model
+        state.state = {name: values[name] for name in order}
+        state.round = round
+        state.prepare()
+        return state
+
 
 class Model(object):
     "Models contain and runs stocks and flows."
@@ -230,35 +452,90 @@ class Model(object):
     def __init__(self, name):
         self.name = name
         self.stocks = []
+        # index of stock names to stocks, kept consistent by
+        # self.stock() and self.infinite_stock()
+        self.stocks_by_name = {}
         self.flows = []
         # initial_path is updated in self.validate_initial_cycles(),
         # and is used to identify the sequence to build up the initial
         # state file
         self.initial_path = []
+        # schedule is updated in self.schedule_flows(), and is the
+        # order that flows are evaluated in each round
+        self.schedule = []
+        # version is incremented whenever stocks or flows change, and
+        # validated is the version that was last successfully validated
+        self.version = 0
+        self.validated = None
+
+    def __setstate__(self, state):
+        "Stocks are pickled without their model, so are linked to it again."
+        self.__dict__.update(state)
+        for stock in self.stocks:
+            stock.model = self
+
+    def changed(self):
+        """
+        Record that the model has changed and must be validated again.
+        Called automatically when adding stocks or flows, or replacing
+        a stock's initial or maximum, but should be called after
+        modifying other parts of the model in place.
+        """
+        self.version += 1
 
     def get_stock(self, name):
-        for stock in self.stocks:
-            if stock.name == name:
-                return stock
+        return self.stocks_by_name.get(name)
 
-    def infinite_stock(self, name):
-        s = Stock(name, Formula(float("+inf")), show=False)
+    def add_stock(self, s):
+        s.model = self
         self.stocks.append(s)
+        self.stocks_by_name.setdefault(s.name, s)
+        self.changed()
         return s
 
+    def infinite_stock(self, name):
+        return self.add_stock(Stock(name, Formula(float("+inf")), show=False))
+
     def stock(self, *args, **kwargs):
-        s = Stock(*args, **kwargs)
-        self.stocks.append(s)
-        return s
+        return self.add_stock(Stock(*args, **kwargs))
 
     def flow(self, *args, **kwargs):
         f = Flow(*args, **kwargs)
         self.flows.append(f)
+        self.changed()
         return f
 
     def validate(self):
+        "Validate model, unless it hasn't changed since it was last validated."
+        if self.validated == self.version:
+            return
         self.validate_existing_stocks()
         self.validate_initial_cycles()
+        for flow in self.flows:
+            flow.prepare()
+        self.schedule_flows()
+        self.validated = self.version
+
+    def schedule_flows(self):
+        """
+        Order flows into groups which don't share any stocks, and so
+        can be evaluated independently of each other.
+
+        When flows depend on each other within a round, because one
+        reads a stock that another removes from, flows declared later
+        are evaluated first, so values pipeline through stocks declared
+        in order. Flows are otherwise ordered by the levels found by
+        systems.algos.find_levels, with results identical to
+        evaluating every flow in reverse order of declaration.
+        """
+        flows = list(reversed(self.flows))
+        accesses = [f.accesses() for f in flows]
+        levels = systems.algos.find_levels(accesses)
+        components = systems.algos.find_components(
+            [reads | writes | appends for reads, writes, appends in accesses])
+        self.schedule = [
+            [flows[i] for i in sorted(group, key=lambda i: (levels[i], i))]
+            for group in components]
 
     def validate_initial_cycles(self):
         "References in initial values must not have cycles."
@@ -287,7 +564,7 @@ class Model(object):
         but usually these are typos, so I think the least surprising
         behavior here is to error as opposed to implicitly create.
         """
-        stocks = [s.name for s in self.stocks]
+        stocks = self.stocks_by_name
         refs = []
         for stock in self.stocks:
             refs += [(stock.maximum, x) for x in stock.maximum.references()]
@@ -298,53 +575,181 @@ class Model(object):
             if ref not in stocks:
                 raise InvalidFormula(formula, "reference to non-existant stock '%s'" % ref)
 
-    def run(self, rounds=10):
+    def run(self, rounds=10, engine=None, processes=None):
+        """
+        Run model for rounds, returning Results with a snapshot of every round.
+
+        The default engine steps through the model in Python. Passing
+        engine='numpy' evaluates flows as batched array operations,
+        which is faster for large models and requires numpy.
+
+        With processes, the default engine simulates independent groups
+        of stocks and flows in a pool of worker processes.
+        """
         self.validate()
 
+        if engine == "numpy":
+            if processes:
+                raise ValueError("processes is only supported by the python engine")
+            import systems.vectorized
+            return systems.vectorized.run(self, rounds)
+        elif engine not in (None, "python"):
+            raise UnknownEngine(engine)
+
+        if processes:
+            import systems.parallel
+            return systems.parallel.run(self, rounds, processes)
+
         s = State(self)
-        snapshots = [s.snapshot()]
+        results = Results(s.state)
+        results.append(s.state)
+        for i in range(rounds):
+            s.advance()
+            results.append(s.state)
+        return results
+
+    def resume(self, checkpoint, rounds=10):
+        """
+        Resume running model from a checkpoint made by State.checkpoint,
+        returning Results starting with the checkpointed round.
+        """
+        s = State.restore(self, checkpoint)
+        results = Results(s.state)
+        results.append(s.state)
         for i in range(rounds):
             s.advance()
-            snapshots.append(s.snapshot())
-        return snapshots
-
-    def render_html(self, results):
-        rows = ["<table>", "<theader>", "<tr>"]
-        col_stocks = [s for s in self.stocks if s.show]
-        rows += ["<td><strong>Round</strong></td>"]
-        rows += ["<td><strong>%s</strong></td>" % s.name for s in col_stocks]
-        rows += ["</tr>", "</theader>", "<tbody>"]
-
-        for i, snapshot in enumerate(results):
-            row = "<tr><td>%s</td>" % i
-            for j, col in enumerate(col_stocks):
-                num = str(snapshot[col.name])
-                row += "<td>%s</td>" % num
-            row += "</tr>"
-            rows.append(row)
-        rows += ["</tbody>", "</table>"]
-        return "\n".join(rows)
-
-    def render(self, results, sep='\t', pad=True):
+            results.append(s.state)
+        return results
+
+    def run_until_steady(self, rounds=10000, tolerance=0):
+        """
+        Run model until it reaches a steady state, for at most rounds.
+
+        A model is steady once a round's values repeat an earlier round,
+        either the previous round for a fixed point, or an earlier one
+        for a cycle. Values are equal when they differ by no more than
+        tolerance. The returned Results include the first repeated round,
+        and results.steady and results.period are set to the round the
+        steady state started and the number of rounds it repeats in,
+        or are None if the model wasn't steady within rounds.
+        """
+        self.validate()
+        s = State(self)
+        results = Results(s.state)
+        names = results.names
+        # rounds indexed by their values, or approximate values when
+        # there's a tolerance, to detect cycles without comparing
+        # against every previous round
+        seen = {}
+        for i in range(rounds + 1):
+            if i:
+                s.advance()
+            results.append(s.state)
+            values = [s.state[name] for name in names]
+            key = tuple(values) if not tolerance else tuple(
+                round(v / tolerance) if math.isfinite(v) else v for v in values)
+
+            for j in (i - 1, seen.get(key)):
+                if j is not None and j >= 0 and steady(results.row(j), values, tolerance):
+                    results.steady = j
+                    results.period = i - j
+                    return results
+            seen[key] = i
+        return results
+
+    def iter_run(self, rounds=10, stocks=None, every=1):
+        """
+        Run model for rounds, yielding snapshots as they're produced
+        instead of holding every round in memory.
+
+        Snapshots can be limited to the stocks in stocks, and only
+        every nth round is yielded when every is specified.
+        """
+        self.validate()
+        return self.iterate(State(self), rounds, stocks, every)
+
+    def iterate(self, state, rounds, stocks=None, every=1):
+        "Advance state for rounds, returning an iterator of snapshots."
+        if every < 1:
+            raise ValueError("every must be at least 1, not %s" % (every,))
+        return self._iterate(state, rounds, stocks, every)
+
+    def _iterate(self, state, rounds, stocks, every):
+        for i in range(rounds + 1):
+            if i:
+                state.advance()
+            if i % every == 0:
+                if stocks is None:
+                    yield state.snapshot()
+                else:
+                    yield {name: state.state[name] for name in stocks}
+
+    def shown(self):
+        "Names of stocks which are shown when rendering results."
+        return [s.name for s in self.stocks if s.show]
+
+    def rows(self, results, names):
+        """
+        Iterate over the values of stocks in names for each round of
+        results, reading Results by column rather than building a
+        snapshot of every stock for every round.
+        """
+        if isinstance(results, Results):
+            if not names:
+                # zip of no columns would stop before the first round
+                return ([] for _ in range(len(results)))
+            return zip(*[results.columns[results.index[name]] for name in names])
+        return ([snapshot[name] for name in names] for snapshot in results)
+
+    def render_html(self, results, every=1, start=0):
+        "Render results to an HTML table."
+        return "\n".join(self.html_lines(results, every, start))
+
+    def html_lines(self, results, every=1, start=0):
+        "Render results to an HTML table one line at a time."
+        names = self.shown()
+        yield from ("<table>", "<theader>", "<tr>", "<td><strong>Round</strong></td>")
+        for name in names:
+            yield "<td><strong>%s</strong></td>" % name
+        yield from ("</tr>", "</theader>", "<tbody>")
+
+        cells = "".join("<td>%s</td>" for name in names)
+        row = "<tr><td>%s</td>" + cells + "</tr>"
+        for i, values in enumerate(self.rows(results, names)):
+            yield row % (start + i * every, *values)
+        yield from ("</tbody>", "</table>")
+
+    def write_html(self, results, out, every=1, start=0):
+        "Write results to file-like out as an HTML table, without rendering it in memory."
+        out.writelines(line + "\n" for line in self.html_lines(results, every, start))
+
+    def render(self, results, sep='\t', pad=True, every=1, start=0):
         "Render results to string from Model run."
-        lines = []
-
-        col_stocks = [s for s in self.stocks if s.show]
-        header = sep[:]
-        header += sep.join([s.name for s in col_stocks])
-        col_size = [len(s.name) for s in col_stocks]
-        lines.append(header)
-
-        for i, snapshot in enumerate(results):
-            row = "%s" % i
-            for j, col in enumerate(col_stocks):
-                num = str(snapshot[col.name])
-                if pad:
-                    num = num.ljust(col_size[j])
-
-                row += sep[:] + num
-            lines.append(row)
-        return "\n".join(lines)
+        return "\n".join(self.render_lines(results, sep, pad, every, start))
+
+    def render_lines(self, results, sep='\t', pad=True, every=1, start=0):
+        """
+        Render results one line at a time, consuming results lazily
+        so they can be streamed from Model.iter_run. Rounds are numbered
+        from start, for results resumed from a checkpoint.
+        """
+        names = self.shown()
+        yield sep + sep.join(names)
+
+        if pad:
+            row = sep.join(["%s"] + ["%%-%ds" % len(name) for name in names])
+        else:
+            row = sep.join(["%s"] * (len(names) + 1))
+        for i, values in enumerate(self.rows(results, names)):
+            yield row % (start + i * every, *values)
+
+    def write(self, results, out, sep='\t', pad=True, every=1, start=0):
+        """
+        Write results to file-like out, one line at a time. Stock names
+        and values never need quoting, so pass sep=',' and pad=False
+        for CSV, or pad=False for TSV.
+        """
+        out.writelines(line + "\n" for line in self.render_lines(results, sep, pad, every, start))
 
 
 def main():
@@ -0,0 +1,73 @@
+"""
+Run independent parts of a model in parallel.
+
+Model.schedule_flows splits flows into groups which don't share any
+stocks, for example one group per team's hiring funnel. Groups are
+divided between worker processes, each of which simulates its groups
+for every round, and their columns of results are merged afterwards.
+"""
+import concurrent.futures
+import heapq
+
+import systems.models
+from systems.results import Column, Results
+
+
+def stocks_for(group):
+    "Names of all stocks read or changed by a group of flows."
+    names = set()
+    for flow in group:
+        reads, writes, appends = flow.accesses()
+        names |= reads | writes | appends
+    return names
+
+
+def divide(schedule, chunks):
+    "Divide groups of flows into chunks with similar numbers of flows."
+    heap = [(0, i, []) for i in range(chunks)]
+    for group in sorted(schedule, key=len, reverse=True):
+        size, i, chunk = heapq.heappop(heap)
+        chunk.append(group)
+        heapq.heappush(heap, (size + len(group), i, chunk))
+    return [chunk for _, _, chunk in sorted(heap, key=lambda x: x[1]) if chunk]
+
+
+def simulate(schedule, initial, rounds):
+    "Advance initial through schedule for rounds, returning Results."
+    state = dict(initial)
+    results = Results(state)
+    results.append(state)
+    steps = systems.models.flatten_schedule(schedule)
+    pending = [0] * len(steps)
+    for i in range(rounds):
+        systems.models.advance_steps(state, steps, pending)
+        results.append(state)
+    return results
+
+
+def run(model, rounds, processes):
+    "Run validated model, simulating its independent groups in processes."
+    initial = systems.models.State(model).state
+    chunks = divide(model.schedule, processes)
+    initials = []
+    for chunk in chunks:
+        names = set()
+        for group in chunk:
+            names |= stocks_for(group)
+        initials.append({name: initial[name] for name in initial if name in names})
+
+    with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+        parts = list(executor.map(simulate, chunks, initials, [rounds] * len(chunks)))
+
+    columns = {}
+    for part in parts:
+        for name, column in zip(part.names, part.columns):
+            columns[name] = column
+
+    # stocks without flows never change
+    for name, value in initial.items():
+        if name not in columns:
+            columns[name] = Column()
+            for i in range(rounds + 1):
+                columns[name].append(value)
+    return Results.from_columns(list(initial), [columns[name] for name in initial])
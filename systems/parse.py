@@ -1,11 +1,8 @@
-import re
 import sys
-import traceback
-import argparse
 
 import systems.models
 import systems.lexer as lexer
-from systems.errors import ParseException, ParseError, UnknownFlowType, ConflictingValues, DeferLineInfo
+from systems.errors import InvalidCheckpoint, ParseException, ParseError, UnknownFlowType, ConflictingValues, DeferLineInfo
 
 
 def build_stock(model, token_tuple):
@@ -78,14 +75,29 @@ def parse_flow(model, src, dest, txt):
 
 
 def parse(txt, tracebacks=True):
+    """
+    Parse a model from its definition, either a string or an iterable
+    of lines such as an open file. Lines are lexed and added to the
+    model as they're read, so the whole definition is never in memory.
+    """
     m = systems.models.Model("Parsed")
-    stocks = []
-    by_name = {}
-    flows = []
+    if isinstance(txt, str):
+        txt = txt.split(lexer.NEWLINE)
 
-    _, tokens = lexer.lex(txt)
-    for token in tokens:
-        _, n, line = token
+    for n, txt_line in enumerate(txt, 1):
+        if txt_line.endswith(lexer.NEWLINE):
+            txt_line = txt_line[:-1]
+        try:
+            # lexed here rather than by lexer.lex_lines, to number lexer errors
+            line = lexer.lex_line(txt_line)
+        except DeferLineInfo as dli:
+            dli.line = txt_line
+            dli.line_number = n
+            raise dli
+        except Exception as e:
+            raise ParseError(txt_line, n, e)
+        if not line:
+            continue
         first_stock = None
         second_stock = None
 
@@ -100,12 +112,14 @@ def parse(txt, tracebacks=True):
                     build_flow(m, first_stock, second_stock, token)
         except DeferLineInfo as dli:
             if tracebacks:
+                import traceback
                 traceback.print_exc(file=sys.stdout)
             dli.line = line
             dli.line_number = n
             raise dli
         except Exception as e:
             if tracebacks:
+                import traceback
                 traceback.print_exc(file=sys.stdout)
             raise ParseError(line, n, e)
 
@@ -113,6 +127,8 @@ def parse(txt, tracebacks=True):
 
 
 def main():
+    # imported here to keep importing systems.parse fast
+    import argparse
     p = argparse.ArgumentParser()
     p.add_argument(
         '-r',
@@ -120,23 +136,101 @@ def main():
         type=int,
         help="number of rounds to run evaluation",
         default=10)
-    p.add_argument('--csv', action='store_true', default=False)
+    output = p.add_mutually_exclusive_group()
+    output.add_argument('--csv', action='store_true', default=False)
+    output.add_argument('--tsv', action='store_true', default=False)
+    output.add_argument('--html', action='store_true', default=False)
+    output.add_argument(
+        '--binary',
+        metavar='FILE',
+        help="write every stock's values to FILE as memory-mappable columns of floats")
+    p.add_argument(
+        '--every',
+        type=int,
+        help="only output every nth round",
+        default=1)
+    p.add_argument(
+        '--until-steady',
+        action='store_true',
+        help="stop once the model reaches a steady state, running at most rounds",
+        default=False)
+    p.add_argument(
+        '--resume',
+        help="continue from a checkpoint file written by --checkpoint, running rounds more rounds")
+    p.add_argument(
+        '--checkpoint',
+        help="write the state after the last round to this file")
+    p.add_argument(
+        '--cache-dir',
+        help="cache parsed models in this directory, defaults to $SYSTEMS_CACHE_DIR",
+        default=None)
+    p.add_argument(
+        '--serve',
+        action='store_true',
+        help="run requests as newline-delimited JSON from stdin, see systems.server",
+        default=False)
+    p.add_argument(
+        '--socket',
+        help="with --serve, listen for requests on a unix socket at this path instead of stdin")
     args = p.parse_args()
+    if args.until_steady and (args.resume or args.checkpoint):
+        p.error("--until-steady can't be combined with --resume or --checkpoint")
+    if args.every < 1:
+        p.error("--every must be at least 1")
+    if args.socket and not args.serve:
+        p.error("--socket requires --serve")
+
+    if args.serve:
+        from systems import server
+        server.main(args.socket, args.cache_dir)
+        return
 
-    txt = sys.stdin.read()
-
+    from systems import cache
     try:
-        model = parse(txt)
+        model = cache.parse(sys.stdin, args.cache_dir)
     except ParseException as pe:
         print(pe)
         return
 
-    results = model.run(rounds=args.rounds)
-    kwargs = {}
-    if args.csv:
-        kwargs['sep'] = ','
-        kwargs['pad'] = False
-    print(model.render(results, **kwargs))
+    if args.until_steady:
+        results = model.run_until_steady(rounds=args.rounds)
+        if results.steady is not None:
+            print("steady from round %s, repeating every %s rounds" % (results.steady, results.period),
+                  file=sys.stderr)
+        results = results[::args.every]
+        state = None
+    else:
+        model.validate()
+        if args.resume:
+            with open(args.resume, 'rb') as fin:
+                try:
+                    state = systems.models.State.restore(model, fin.read())
+                except InvalidCheckpoint as ic:
+                    print(ic)
+                    return
+        else:
+            state = systems.models.State(model)
+        results = model.iterate(state, args.rounds, every=args.every)
+
+    kwargs = {'every': args.every, 'start': state.round if state else 0}
+    if args.binary:
+        from systems import columnar
+        # snapshots are written as they're produced, rather than held in memory
+        rounds = len(results) if state is None else args.rounds // args.every + 1
+        with open(args.binary, 'wb') as fout:
+            columnar.write_snapshots(results, rounds, fout, **kwargs)
+    elif args.csv:
+        model.write(results, sys.stdout, sep=',', pad=False, **kwargs)
+    elif args.tsv:
+        model.write(results, sys.stdout, pad=False, **kwargs)
+    elif args.html:
+        model.write_html(results, sys.stdout, **kwargs)
+    else:
+        model.write(results, sys.stdout, **kwargs)
+
+    if args.checkpoint:
+        with open(args.checkpoint, 'wb') as fout:
+            fout.write(state.checkpoint())
 
 
 if __name__ == "__main__":
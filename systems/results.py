@@ -0,0 +1,134 @@
+"""
+Columnar storage for the results of running a model.
+
+Rather than a dictionary per round, results store one typed array
+per stock along with a single index of stock names, while still
+supporting access to each round's snapshot via results[i][name].
+"""
+from array import array
+
+INT_MIN = -2 ** 63
+INT_MAX = 2 ** 63 - 1
+# integers of larger magnitude can't all be stored exactly as floats
+EXACT = 2 ** 53
+
+
+def exact(value):
+    "Whether value can be stored as a float without changing it."
+    return type(value) is not int or -EXACT <= value <= EXACT
+
+
+class Column:
+    """
+    Values of one stock, stored as integers until a float is appended,
+    after which values are stored as floats and ints tracks which
+    values were originally integers. Columns mixing floats with
+    integers too large to store exactly as floats are stored as a list.
+    """
+
+    def __init__(self, values=None, ints=None):
+        self.values = values if values is not None else array('q')
+        self.ints = ints
+
+    def append(self, value):
+        if self.ints is None:
+            if type(value) is int and INT_MIN <= value <= INT_MAX or type(self.values) is list:
+                self.values.append(value)
+                return
+            if exact(value) and (not self.values or -EXACT <= min(self.values) and max(self.values) <= EXACT):
+                self.ints = bytearray(b'\x01') * len(self.values)
+                self.values = array('d', self.values)
+            else:
+                self.values = list(self.values)
+                self.values.append(value)
+                return
+        elif not exact(value):
+            self.values = list(self)
+            self.ints = None
+            self.values.append(value)
+            return
+        self.ints.append(type(value) is int)
+        self.values.append(value)
+
+    def __getitem__(self, i):
+        value = self.values[i]
+        if self.ints is not None and self.ints[i]:
+            return int(value)
+        return value
+
+    def __iter__(self):
+        if self.ints is None:
+            return iter(self.values)
+        return (int(value) if is_int else value for value, is_int in zip(self.values, self.ints))
+
+    def __len__(self):
+        return len(self.values)
+
+
+class Results:
+    "Snapshots for each round of a model run, stored by column."
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.columns = [Column() for _ in self.names]
+        self.rounds = 0
+        # set by Model.run_until_steady to the first round of the
+        # fixed point or cycle, and the number of rounds it repeats in
+        self.steady = None
+        self.period = None
+
+    @classmethod
+    def from_columns(cls, names, columns):
+        "Build results from a Column, or a sequence of floats, for each stock."
+        results = cls(names)
+        for i, values in enumerate(columns):
+            if not isinstance(values, Column):
+                values = array('d', values)
+                values = Column(values, bytearray(len(values)))
+            results.columns[i] = values
+        results.rounds = len(results.columns[0]) if results.columns else 0
+        return results
+
+    def append(self, state):
+        "Append a round's values from state, a mapping of stock names to values."
+        for name, column in zip(self.names, self.columns):
+            column.append(state[name])
+        self.rounds += 1
+
+    def row(self, i):
+        "Values of every stock in round i, in the order of names."
+        return [column[i] for column in self.columns]
+
+    def column(self, name):
+        """
+        Return a typed array of every round's value for stock,
+        which are floats if any value was a float, or a list if
+        integers were too large to store exactly as floats.
+        """
+        return self.columns[self.index[name]].values
+
+    def __len__(self):
+        return self.rounds
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.rounds))]
+        if i < 0:
+            i += self.rounds
+        if not 0 <= i < self.rounds:
+            raise IndexError("results index out of range")
+        return {name: column[i] for name, column in zip(self.names, self.columns)}
+
+    def __iter__(self):
+        for i in range(self.rounds):
+            yield self[i]
+
+    def __eq__(self, other):
+        try:
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
@@ -0,0 +1,141 @@
+"""
+Long-lived server which runs models in response to requests, keeping
+recently used models parsed and validated between requests.
+
+Requests and responses are newline-delimited JSON, read from stdin or
+from connections to a unix socket. Each request specifies a model by
+its definition or by the hash returned for an earlier request, along
+with the number of rounds and any overrides in the format used by
+systems.batch:
+
+    {"id": 1, "model": "[a] > b @ 5", "rounds": 3}
+    {"id": 2, "hash": "<hash>", "rounds": 3, "overrides": {"rates": {"a > b": 2}}}
+
+Responses echo the request's id, and include the model's hash, the
+stock names and each round's values, or an error:
+
+    {"id": 1, "hash": "<hash>", "names": ["a", "b"], "values": [[Infinity, 0], ...]}
+    {"id": 3, "error": "..."}
+
+Infinite values are written as Infinity, as by Python's json module.
+"""
+import collections
+import json
+import os
+import re
+import sys
+
+import systems.batch
+import systems.cache
+from systems.errors import UnknownModel
+
+
+# number of parsed models kept in memory
+MODELS = 128
+# hashes are sha256 hex digests, as returned by systems.cache.key
+HASH = re.compile(r'[0-9a-f]{64}')
+
+
+class Server:
+    "Runs requests, keeping the most recently used models in memory."
+
+    def __init__(self, size=MODELS, cache_dir=None):
+        self.size = size
+        self.cache_dir = systems.cache.cache_dir(cache_dir)
+        self.models = collections.OrderedDict()
+
+    def model(self, request):
+        "Find the model for request, returning its hash and the model."
+        if 'model' in request:
+            txt = request['model']
+            key = systems.cache.key(txt)
+            model = self.models.get(key)
+            if model is None:
+                model = systems.cache.parse(txt, self.cache_dir, tracebacks=False)
+        elif 'hash' in request:
+            key = request['hash']
+            # keys become paths within the cache directory
+            if not isinstance(key, str) or not HASH.fullmatch(key):
+                raise ValueError("hash must be 64 lowercase hexadecimal characters")
+            model = self.models.get(key)
+            if model is None and self.cache_dir:
+                model = systems.cache.load(os.path.join(self.cache_dir, key + systems.cache.SUFFIX))
+            if model is None:
+                raise UnknownModel(key)
+        else:
+            raise ValueError("request must include a model or a hash")
+
+        self.models[key] = model
+        self.models.move_to_end(key)
+        while len(self.models) > self.size:
+            self.models.popitem(last=False)
+        return key, model
+
+    def run(self, request):
+        "Run request, returning its response."
+        key, model = self.model(request)
+        if request.get('overrides'):
+            model = systems.batch.apply_overrides(model, request['overrides'])
+        results = model.run(rounds=request.get('rounds', 10), engine=request.get('engine'))
+        return {
+            'hash': key,
+            'names': results.names,
+            'values': [results.row(i) for i in range(len(results))],
+        }
+
+    def respond(self, line):
+        "Respond to one line of JSON, returning errors rather than raising them."
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as e:
+            return {'id': None, 'error': "invalid request: %s" % (e,)}
+
+        response = {'id': request.get('id')}
+        try:
+            response.update(self.run(request))
+        except Exception as e:
+            # any failure belongs to this request, such as dividing by
+            # zero in a formula or a missing optional engine
+            response['error'] = "%s: %s" % (e.__class__.__name__, e)
+        return response
+
+    def serve(self, lines, out):
+        "Respond to each request in lines, writing responses to out."
+        for line in lines:
+            if line.strip():
+                out.write(json.dumps(self.respond(line)) + "\n")
+                out.flush()
+
+    def listen(self, path):
+        "Create a server handling connections to a unix socket at path."
+        import io
+        import socketserver
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                lines = io.TextIOWrapper(self.rfile, encoding='utf-8')
+                out = io.TextIOWrapper(self.wfile, encoding='utf-8')
+                server.serve(lines, out)
+
+        # requests are handled one at a time, as runs share models
+        return socketserver.UnixStreamServer(path, Handler)
+
+
+def main(socket=None, cache_dir=None):
+    "Serve requests from stdin, or from a unix socket at socket."
+    server = Server(cache_dir=cache_dir)
+    if socket is None:
+        server.serve(sys.stdin, sys.stdout)
+        return
+
+    listener = server.listen(socket)
+    try:
+        listener.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.server_close()
+        os.remove(socket)
@@ -0,0 +1,344 @@
+"""
+Vectorized simulation engine backed by numpy.
+
+Stocks are mapped to array columns once, and flows are grouped into
+levels by systems.algos.find_levels, so that each level is evaluated
+using batched array operations. Flows removing from the same source,
+such as a stock feeding many others, share a level and are removed
+from their source one after another. Results match systems.models.State,
+which remains the reference engine, although values are always floats.
+Dividing by zero raises ZeroDivisionError as in the reference engine,
+but other non-finite values, such as leaking an infinite rate, are
+kept as floats where the reference engine raises OverflowError.
+"""
+import math
+
+import numpy as np
+
+import systems.algos
+import systems.lexer
+import systems.models
+from systems.results import Results
+
+
+RATE = 0
+CONVERSION = 1
+LEAK = 2
+
+
+def rate_kind(rate):
+    "Identify how a rate calculates its changes."
+    kinds = {
+        systems.models.Rate: RATE,
+        systems.models.Conversion: CONVERSION,
+        systems.models.Leak: LEAK,
+    }
+    if type(rate) not in kinds:
+        raise TypeError("numpy engine doesn't support rate %s" % (rate,))
+    return kinds[type(rate)]
+
+
+def divide(left, right):
+    "Divide arrays, raising ZeroDivisionError as Python does rather than returning inf or nan."
+    if np.any(right == 0):
+        raise ZeroDivisionError("division by zero")
+    return left / right
+
+
+def operation(op):
+    "Function applying op to columns."
+    if op == '/':
+        return divide
+    return systems.models.OPERATIONS[op]
+
+
+def compile_formula(formula):
+    """
+    Compile formula into an evaluator over a mapping of stock names to
+    columns, applying the formula's default to each element.
+    """
+    _, tokens = formula.lexed
+    children = iter(formula.children)
+
+    def compile_value(token):
+        if token[0] == systems.lexer.TOKEN_FORMULA:
+            return compile_formula(next(children))
+        return systems.models._compile_value(token, [])
+
+    first = compile_value(tokens[0])
+    operations = [(operation(tokens[i][1]), compile_value(tokens[i+1])) for i in range(1, len(tokens), 2)]
+    evaluator = systems.models._compile_operations(first, operations)
+
+    default = formula.default
+
+    def evaluate(columns):
+        value = evaluator(columns)
+        return np.where(value != 0, value, default)
+    return evaluate
+
+
+def change(kind, src, dest, evaluated, capacity):
+    """
+    Calculate the amounts one flow removes from its source and adds
+    to its destination, as Level.changes does for a batch of flows.
+    """
+    if kind == RATE:
+        if not src > 0:
+            return 0, 0
+        rate = evaluated if src - evaluated >= 0 else src
+        rate = rate if rate > 0 else 0
+        rate = rate if rate < capacity else capacity
+        return rate, rate
+    if kind == CONVERSION:
+        if dest == math.inf or capacity == math.inf:
+            max_src_change = src
+        else:
+            max_src_change = max(0, math.floor((capacity - dest) / evaluated))
+        converted = math.floor(max_src_change * evaluated)
+        if converted == 0:
+            return 0, 0
+        return max_src_change, converted
+    leaked = math.floor(src * evaluated)
+    if not (math.isnan(capacity) or leaked < capacity):
+        leaked = capacity
+    return leaked, leaked
+
+
+class Values:
+    """
+    Per-flow values of each scenario's formulas, folding constant
+    formulas once and evaluating formulas shared by every scenario
+    as a single array operation.
+    """
+
+    def __init__(self, formulas, scenario_columns):
+        scenarios = len(formulas[0]) if formulas else 1
+        self.constants = np.zeros((scenarios, len(formulas)))
+        self.dynamic = []
+        for i, options in enumerate(formulas):
+            if all(f.constant for f in options):
+                self.constants[:, i] = [f.value for f in options]
+            elif all(f is options[0] for f in options):
+                self.dynamic.append((i, slice(None), None, compile_formula(options[0])))
+            else:
+                for j, formula in enumerate(options):
+                    self.dynamic.append((i, slice(j, j+1), scenario_columns[j], compile_formula(formula)))
+
+    def evaluate(self, columns):
+        if not self.dynamic:
+            return self.constants
+        values = self.constants.copy()
+        for i, scenarios, scenario_columns, evaluator in self.dynamic:
+            values[scenarios, i] = evaluator(scenario_columns or columns)
+        return values
+
+
+class Level:
+    "Flows which can be evaluated together as one batch."
+
+    def __init__(self, positions, flows, index, scenario_columns):
+        # flows contains the corresponding flow from each scenario
+        first = [f[0] for f in flows]
+        self.positions = np.array(positions, dtype=np.intp)
+        self.source = np.array([index[f.source.name] for f in first], dtype=np.intp)
+        self.destination = np.array([index[f.destination.name] for f in first], dtype=np.intp)
+        self.kinds = [rate_kind(f.rate) for f in first]
+        kinds = np.array(self.kinds)
+        self.is_rate = kinds == RATE
+        self.is_conversion = kinds == CONVERSION
+        self.rates = Values([[s.rate.formula for s in f] for f in flows], scenario_columns)
+        self.maximums = Values([[s.destination.maximum for s in f] for f in flows], scenario_columns)
+
+        # flows sharing a source are removed from it in order, and
+        # other flows are removed from their sources as one batch
+        by_source = {}
+        for i, column in enumerate(self.source.tolist()):
+            by_source.setdefault(column, []).append(i)
+        self.chains = [
+            (column, np.array(chain, dtype=np.intp), [self.kinds[i] for i in chain])
+            for column, chain in by_source.items() if len(chain) > 1]
+        single = [chain[0] for chain in by_source.values() if len(chain) == 1]
+        self.single = np.array(single, dtype=np.intp)
+        self.single_source = self.source[self.single]
+
+    def inputs(self, state, columns):
+        "Values of each flow's source, destination, rate and destination's remaining capacity."
+        src = state[:, self.source]
+        dest = state[:, self.destination]
+        evaluated = self.rates.evaluate(columns)
+        maximum = self.maximums.evaluate(columns)
+        capacity = np.where(dest != np.inf, maximum - dest, maximum)
+        return src, dest, evaluated, capacity
+
+    def changes(self, src, dest, evaluated, capacity):
+        "Calculate amounts removed from sources and added to destinations."
+        inf = np.inf
+
+        # Rate
+        rate = np.where(src - evaluated >= 0, evaluated, src)
+        rate = np.where(rate > 0, rate, 0)
+        rate = np.where(rate < capacity, rate, capacity)
+        rate = np.where(src > 0, rate, 0)
+
+        # Conversion
+        unbounded = (dest == inf) | (capacity == inf)
+        if np.any(self.is_conversion & ~unbounded & (evaluated == 0)):
+            raise ZeroDivisionError("float division by zero")
+        bounded = np.floor((capacity - dest) / evaluated)
+        max_src_change = np.where(unbounded, src, np.where(bounded > 0, bounded, 0))
+        converted = np.floor(max_src_change * evaluated)
+        empty = converted == 0
+        conversion_rem = np.where(empty, 0, max_src_change)
+        conversion_add = np.where(empty, 0, converted)
+
+        # Leak
+        leaked = np.floor(src * evaluated)
+        leaked = np.where(np.isnan(capacity) | (leaked < capacity), leaked, capacity)
+
+        rem = np.where(self.is_rate, rate, np.where(self.is_conversion, conversion_rem, leaked))
+        add = np.where(self.is_rate, rate, np.where(self.is_conversion, conversion_add, leaked))
+        return rem, add
+
+    def advance(self, state, columns):
+        "Remove each flow's change from its source, returning the amounts to add to destinations."
+        src, dest, evaluated, capacity = self.inputs(state, columns)
+        rem, add = self.changes(src, dest, evaluated, capacity)
+        state[:, self.single_source] -= rem[:, self.single]
+        for column, chain, kinds in self.chains:
+            for scenario in range(state.shape[0]):
+                value = state[scenario, column].item()
+                values = zip(
+                    kinds,
+                    dest[scenario, chain].tolist(),
+                    evaluated[scenario, chain].tolist(),
+                    capacity[scenario, chain].tolist())
+                added = []
+                for kind, d, e, c in values:
+                    removed, amount = change(kind, value, d, e, c)
+                    value -= removed
+                    added.append(amount)
+                state[scenario, column] = value
+                add[scenario, chain] = added
+        return add
+
+
+def flow_accesses(flow):
+    """
+    Accesses of a flow for systems.algos.find_levels, where removing
+    from its source is a chained write unless the flow's rate or its
+    destination's maximum depend on the source.
+    """
+    reads, writes, appends = flow.accesses()
+    source = flow.source.name
+    if (source == flow.destination.name
+            or source in flow.rate.formula.references()
+            or source in flow.destination.maximum.references()):
+        return reads, writes, appends, set()
+    return reads - {source}, set(), appends, writes
+
+
+def merge_accesses(accesses):
+    "Merge accesses of the corresponding flow in each scenario."
+    reads, writes, appends, chains = set(), set(), set(), set()
+    for r, w, a, c in accesses:
+        reads |= r
+        writes |= w
+        appends |= a
+        chains |= c
+    # scenarios which read their source can't be chained
+    return reads, writes, appends, chains - writes
+
+
+class Plan:
+    """
+    Column indices and levels for a model's flows, computed once
+    and then reused for every round.
+
+    Plans can run several scenarios of one model at once, as long as
+    the scenarios only differ in the formulas for their stocks and flows.
+    """
+
+    def __init__(self, models, names, state):
+        self.names = names
+        index = {name: i for i, name in enumerate(names)}
+        self.columns = {name: state[:, i] for name, i in index.items()}
+        scenario_columns = ScenarioColumns(state, index)
+
+        # reverse order of declaration, as in Model.schedule_flows,
+        # with the corresponding flow from each scenario
+        flows = list(zip(*[reversed(m.flows) for m in models]))
+        levels = systems.algos.find_levels(
+            [merge_accesses([flow_accesses(f) for f in scenarios]) for scenarios in flows])
+        by_level = [[] for _ in range(max(levels, default=-1) + 1)]
+        for i, level in enumerate(levels):
+            by_level[level].append(i)
+        self.levels = [
+            Level(positions, [flows[i] for i in positions], index, scenario_columns)
+            for positions in by_level]
+
+        flows = [f[0] for f in flows]
+
+        # deferred additions are applied in passes where each destination
+        # appears at most once, preserving the order they're added in
+        passes = []
+        seen = {}
+        for i, flow in enumerate(flows):
+            n = seen.get(flow.destination.name, 0)
+            seen[flow.destination.name] = n + 1
+            if n == len(passes):
+                passes.append([])
+            passes[n].append(i)
+        self.passes = [
+            (np.array(p, dtype=np.intp),
+             np.array([index[flows[i].destination.name] for i in p], dtype=np.intp))
+            for p in passes]
+        self.flows = len(flows)
+
+    def advance(self, state, pending):
+        "Advance state, an array of scenarios by stocks, by one round."
+        for level in self.levels:
+            pending[:, level.positions] = level.advance(state, self.columns)
+
+        for positions, destinations in self.passes:
+            state[:, destinations] += pending[:, positions]
+
+
+class ScenarioColumns:
+    "Lazily built mappings of stock names to each scenario's column."
+
+    def __init__(self, state, index):
+        self.state = state
+        self.index = index
+        self.cache = {}
+
+    def __getitem__(self, scenario):
+        if scenario not in self.cache:
+            row = self.state[scenario:scenario+1]
+            self.cache[scenario] = {name: row[:, i] for name, i in self.index.items()}
+        return self.cache[scenario]
+
+
+def simulate(models, rounds, names=None):
+    """
+    Run validated scenarios of a model, returning the stock names
+    and an array of values by scenario, round and stock.
+    """
+    initials = [systems.models.State(m).state for m in models]
+    if names is None:
+        names = list(initials[0])
+    state = np.array([[initial[name] for name in names] for initial in initials], dtype=np.float64)
+    plan = Plan(models, names, state)
+    pending = np.zeros((state.shape[0], plan.flows))
+    history = np.empty((state.shape[0], rounds + 1, state.shape[1]))
+    history[:, 0] = state
+    with np.errstate(all='ignore'):
+        for i in range(rounds):
+            plan.advance(state, pending)
+            history[:, i + 1] = state
+    return names, history
+
+
+def run(model, rounds=10):
+    "Run validated model, returning the same snapshots as Model.run."
+    names, history = simulate([model], rounds)
+    return Results.from_columns(names, history[0].T.tolist())
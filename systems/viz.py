@@ -3,13 +3,13 @@ Tooling to convert a model into a graphviz diagram.
 """
 import sys
 
-from graphviz import Digraph
-
-from . import parse
 from .errors import ParseException
 
 
 def as_dot(model, rankdir="LR"):
+    # graphviz is only needed when rendering, so isn't imported with systems.viz
+    from graphviz import Digraph
+
     mapping = {s.name: str(i) for i, s in enumerate(model.stocks)}    
     dot = Digraph(comment=model.name)
     dot.attr(rankdir=rankdir)
@@ -27,10 +27,10 @@ def as_dot(model, rankdir="LR"):
 
 
 def main():
-    txt = sys.stdin.read()
-
+    from . import cache
     try:
-        model = parse.parse(txt)
+        # cached when SYSTEMS_CACHE_DIR is set
+        model = cache.parse(sys.stdin)
     except ParseException as pe:
         print(pe)
         return
@@ -0,0 +1,84 @@
+"Test algos.py"
+import unittest
+
+import systems.algos
+import systems.parse
+
+
+def graphs(edges, nodes):
+    "Build in and out graphs from (node, edge) pairs."
+    in_graph = {node: [] for node in nodes}
+    out_graph = {node: [] for node in nodes}
+    for node, edge in edges:
+        out_graph[node].append(edge)
+        in_graph[edge].append(node)
+    return in_graph, out_graph
+
+
+class TestAlgos(unittest.TestCase):
+    def test_find_cycles(self):
+        # d depends on c, which depends on b and a, b depends on a
+        in_graph, out_graph = graphs([('d', 'c'), ('c', 'b'), ('c', 'a'), ('b', 'a')], 'abcde')
+        has_cycle, cycles, deps = systems.algos.find_cycles(in_graph, out_graph)
+        self.assertFalse(has_cycle)
+        self.assertEqual({}, cycles)
+        self.assertEqual(['b', 'c', 'd'], deps)
+        # inputs aren't modified
+        self.assertEqual(graphs([('d', 'c'), ('c', 'b'), ('c', 'a'), ('b', 'a')], 'abcde'),
+                         (in_graph, out_graph))
+
+    def test_find_cycles_members(self):
+        # a and b form a cycle, which depends on c, and d depends on the cycle
+        edges = [('a', 'b'), ('b', 'a'), ('b', 'c'), ('d', 'a'), ('e', 'e')]
+        has_cycle, cycles, deps = systems.algos.find_cycles(*graphs(edges, 'abcde'))
+        self.assertTrue(has_cycle)
+        self.assertEqual({'a': ['b'], 'b': ['a'], 'e': ['e']}, cycles)
+        self.assertEqual(['d'], deps)
+
+    def test_find_levels(self):
+        accesses = [
+            ({'c'}, {'c'}, {'d'}),
+            ({'b'}, {'b'}, {'c'}),
+            ({'b', 'x'}, {'x'}, {'y'}),
+            ({'c'}, {'c'}, {'e'}),
+        ]
+        # reading b after it's removed from must wait a level,
+        # removing from c after it's read can happen in the same level
+        self.assertEqual([0, 0, 1, 1], systems.algos.find_levels(accesses))
+
+    def test_find_levels_chained(self):
+        accesses = [
+            (set(), set(), {'b'}, {'a'}),
+            ({'x'}, set(), {'c'}, {'a'}),
+            ({'a'}, {'y'}, {'d'}),
+            (set(), set(), {'e'}, {'a'}),
+            ({'y'}, {'y'}, {'f'}, {'a'}),
+        ]
+        # chained writes to a share a level until a is read
+        self.assertEqual([0, 0, 1, 1, 2], systems.algos.find_levels(accesses))
+
+    def test_find_components(self):
+        nodes = [{'a', 'b'}, {'c'}, {'b', 'd'}, set(), {'c', 'e'}]
+        self.assertEqual([[0, 2], [1, 4], [3]], systems.algos.find_components(nodes))
+
+
+class TestSchedule(unittest.TestCase):
+    def test_schedule(self):
+        txt = """
+        [a] > b @ 5
+        b > c @ 2
+        c > d @ 1
+        [x] > y @ 5
+        y > z @ Leak(0.5)
+        """
+        m = systems.parse.parse(txt)
+        m.validate()
+        groups = [[(f.source.name, f.destination.name) for f in group] for group in m.schedule]
+        self.assertEqual([
+            [('y', 'z'), ('x', 'y')],
+            [('c', 'd'), ('b', 'c'), ('a', 'b')],
+        ], groups)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+"Test batch.py"
+import unittest
+
+import systems.batch
+import systems.parse
+from systems.errors import InvalidOverride
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+SPEC = """
+Recruiters(3)
+[Candidates] > PhoneScreens @ Recruiters * 4
+PhoneScreens > Onsites      @ 0.5
+Onsites      > Offers(0, 10) @ 0.5
+Offers       > Hires        @ 0.5
+Hires        > Employees(5) @ 1.0
+Employees    > Departures   @ Leak(0.1)
+"""
+
+SCENARIOS = [
+    {},
+    {'initial': {'Recruiters': 5}},
+    {'initial': {'Employees': 20}, 'maximum': {'Offers': 'Recruiters * 2'}},
+    {'rates': {'Candidates > PhoneScreens': 7, 'Employees > Departures': 0.2}},
+]
+
+
+class TestBatch(unittest.TestCase):
+    def expected(self, model, rounds):
+        results = []
+        for overrides in SCENARIOS:
+            m = systems.batch.apply_overrides(model, overrides)
+            results.append(m.run(rounds=rounds))
+        return results
+
+    def test_apply_overrides(self):
+        model = systems.parse.parse(SPEC)
+        m = systems.batch.apply_overrides(model, SCENARIOS[3])
+        self.assertEqual(7, m.flows[0].rate.formula.compute())
+        self.assertEqual('Leak', m.flows[-1].rate.__class__.__name__)
+        self.assertEqual(0.2, m.flows[-1].rate.formula.compute())
+        self.assertIs(model.flows[1].rate, m.flows[1].rate)
+        # original model is unchanged
+        self.assertEqual(0.1, model.flows[-1].rate.formula.compute())
+
+    def test_invalid_overrides(self):
+        model = systems.parse.parse(SPEC)
+        for overrides in [{'initial': {'Fake': 1}}, {'rates': {'a > b': 1}}, {'fake': {}}]:
+            with self.assertRaises(InvalidOverride):
+                systems.batch.apply_overrides(model, overrides)
+
+    def test_run_batch(self):
+        model = systems.parse.parse(SPEC)
+        expected = self.expected(model, 10)
+        results = systems.batch.run_batch(model, SCENARIOS, rounds=10)
+        self.assertEqual(len(SCENARIOS), len(results))
+        for i, snapshots in enumerate(expected):
+            self.assertEqual(snapshots, results[i])
+        self.assertEqual([s[-1]['Employees'] for s in expected],
+                         [series[-1] for series in results.stock('Employees')])
+
+    def test_run_batch_processes(self):
+        model = systems.parse.parse(SPEC)
+        expected = self.expected(model, 10)
+        results = systems.batch.run_batch(model, SCENARIOS, rounds=10, processes=2)
+        for i, snapshots in enumerate(expected):
+            self.assertEqual(snapshots, results[i])
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_run_batch_numpy(self):
+        model = systems.parse.parse(SPEC)
+        expected = self.expected(model, 10)
+        for processes in (None, 2):
+            results = systems.batch.run_batch(model, SCENARIOS, rounds=10, engine="numpy", processes=processes)
+            self.assertEqual((len(SCENARIOS), 11, len(results.names)), results.values.shape)
+            for i, snapshots in enumerate(expected):
+                self.assertEqual(snapshots, results[i])
+
+
+if __name__ == "__main__":
+    unittest.main()
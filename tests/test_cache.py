@@ -0,0 +1,83 @@
+"Test cache.py"
+import os
+import shutil
+import tempfile
+import unittest
+
+import systems
+import systems.cache
+import systems.parse
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def entries(self):
+        return sorted(os.listdir(self.dir))
+
+    def test_cache(self):
+        txt = open("examples/hiring.txt").read()
+        expected = systems.parse.parse(txt).run(rounds=10)
+
+        first = systems.cache.parse(txt, self.dir)
+        self.assertEqual([systems.cache.key(txt) + systems.cache.SUFFIX], self.entries())
+        with open(os.path.join(self.dir, self.entries()[0]), 'rb') as fin:
+            cached = fin.read()
+
+        second = systems.cache.parse(open("examples/hiring.txt"), self.dir)
+        self.assertIsNot(first, second)
+        self.assertEqual(second.version, second.validated)
+        self.assertEqual(expected, second.run(rounds=10))
+
+        # loaded models still track edits
+        second.get_stock('Employees').initial = systems.models.Formula(10)
+        self.assertEqual(10, second.run(rounds=1)[0]['Employees'])
+
+        # corrupt entries are replaced
+        path = os.path.join(self.dir, self.entries()[0])
+        with open(path, 'wb') as fout:
+            fout.write(b'corrupt')
+        self.assertEqual(expected, systems.cache.parse(txt, self.dir).run(rounds=10))
+        with open(path, 'rb') as fin:
+            self.assertEqual(cached, fin.read())
+
+    def test_key(self):
+        txt = "a > b @ 1"
+        key = systems.cache.key(txt)
+        self.assertNotEqual(key, systems.cache.key(txt + "\n"))
+        version = systems.version
+        try:
+            systems.version = version + ".dev"
+            self.assertNotEqual(key, systems.cache.key(txt))
+        finally:
+            systems.version = version
+
+    def test_evict(self):
+        for i in range(5):
+            systems.cache.parse("a(%d) > b @ 1" % i, self.dir)
+            path = os.path.join(self.dir, systems.cache.key("a(%d) > b @ 1" % i) + systems.cache.SUFFIX)
+            os.utime(path, (i, i))
+        size = os.path.getsize(path)
+        # using an entry makes it the most recently used
+        systems.cache.parse("a(0) > b @ 1", self.dir)
+
+        systems.cache.evict(self.dir, max_size=size * 3)
+        kept = {systems.cache.key("a(%d) > b @ 1" % i) + systems.cache.SUFFIX for i in (0, 3, 4)}
+        self.assertEqual(sorted(kept), self.entries())
+
+    def test_disabled(self):
+        environ = os.environ.pop(systems.cache.ENV_CACHE_DIR, None)
+        try:
+            self.assertIsNone(systems.cache.cache_dir())
+            systems.cache.parse("a > b @ 1")
+            os.environ[systems.cache.ENV_CACHE_DIR] = self.dir
+            systems.cache.parse("a > b @ 1")
+            self.assertEqual(1, len(self.entries()))
+        finally:
+            os.environ.pop(systems.cache.ENV_CACHE_DIR, None)
+            if environ is not None:
+                os.environ[systems.cache.ENV_CACHE_DIR] = environ
@@ -0,0 +1,48 @@
+"Test checkpoint.py"
+import math
+import unittest
+
+import systems.checkpoint
+import systems.models
+import systems.parse
+from systems.errors import InvalidCheckpoint
+
+
+class TestCheckpoint(unittest.TestCase):
+    def test_round_trip(self):
+        state = {'a': 1, 'b': 2.5, 'c': float('+inf'), 'd': -2 ** 70, 'e': 0.0, 'é': -3}
+        data = systems.checkpoint.dumps(12, state)
+        round, restored = systems.checkpoint.loads(data)
+        self.assertEqual(12, round)
+        self.assertEqual(state, restored)
+        self.assertEqual(list(state), list(restored))
+        self.assertEqual([type(v) for v in state.values()], [type(v) for v in restored.values()])
+
+        round, restored = systems.checkpoint.loads(systems.checkpoint.dumps(0, {'a': float('nan')}))
+        self.assertTrue(math.isnan(restored['a']))
+
+    def test_invalid(self):
+        data = systems.checkpoint.dumps(3, {'a': 1, 'b': 2.5})
+        for invalid in (b'', b'nonsense', data[:-1], data + b'\x00'):
+            with self.assertRaises(InvalidCheckpoint):
+                systems.checkpoint.loads(invalid)
+
+    def test_resume(self):
+        "Resuming from a checkpoint matches an uninterrupted run."
+        m = systems.parse.parse(open("examples/hiring.txt").read())
+        results = m.run(rounds=30)
+
+        s = systems.models.State(m)
+        for i in range(12):
+            s.advance()
+        checkpoint = s.checkpoint()
+        resumed = m.resume(checkpoint, rounds=18)
+        self.assertEqual(results[12:], resumed)
+
+        restored = systems.models.State.restore(m, checkpoint)
+        self.assertEqual(12, restored.round)
+        self.assertEqual(s.state, restored.state)
+
+        other = systems.parse.parse("a > b @ 1")
+        with self.assertRaises(InvalidCheckpoint):
+            systems.models.State.restore(other, checkpoint)
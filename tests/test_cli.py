@@ -0,0 +1,45 @@
+"Test cli.py"
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import unittest
+
+import systems.cli
+
+
+class TestCli(unittest.TestCase):
+    def test_usage(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.assertEqual(0, systems.cli.main(['--help']))
+            self.assertEqual(2, systems.cli.main([]))
+        for command in systems.cli.COMMANDS:
+            self.assertIn(command, out.getvalue())
+
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(2, systems.cli.main(['unknown']))
+
+    def test_run(self):
+        env = dict(os.environ, PYTHONPATH=os.getcwd())
+        with open("examples/hiring.txt") as fin:
+            result = subprocess.run([sys.executable, "bin/systems", "run", "-r", "2", "--csv"],
+                                    stdin=fin, capture_output=True, text=True, env=env, check=True)
+        self.assertEqual(",PhoneScreens,Onsites,Offers,Hires,Employees,Departures", result.stdout.split("\n")[0])
+        self.assertEqual("2,25,12,0,0,5,0", result.stdout.split("\n")[3])
+
+        with open("examples/hiring.txt") as fin:
+            result = subprocess.run([sys.executable, "bin/systems", "run", "--every", "0"],
+                                    stdin=fin, capture_output=True, text=True, env=env)
+        self.assertEqual(2, result.returncode)
+        self.assertIn("--every must be at least 1", result.stderr)
+
+    def test_lazy_imports(self):
+        "Importing the command line tools doesn't import modules only some commands use."
+        code = "import sys, systems.cli, systems.parse, systems.viz; print(' '.join(sys.modules))"
+        env = dict(os.environ, PYTHONPATH=os.getcwd())
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+        modules = result.stdout.split()
+        for lazy in ('argparse', 'traceback', 'pprint', 'graphviz', 'pickle'):
+            self.assertNotIn(lazy, modules)
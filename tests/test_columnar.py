@@ -0,0 +1,89 @@
+"Test columnar.py"
+import os
+import tempfile
+import unittest
+
+import systems.columnar
+import systems.parse
+from systems.columnar import ColumnarFile
+from systems.errors import InvalidColumnarFile
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestColumnar(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.cols')
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def write(self, results, **kwargs):
+        with open(self.path, 'wb') as fout:
+            systems.columnar.write(results, fout, **kwargs)
+
+    def test_round_trip(self):
+        m = systems.parse.parse(open("examples/hiring.txt").read())
+        results = m.run(rounds=20)
+        self.write(results, every=2, start=10)
+
+        with ColumnarFile(self.path) as f:
+            self.assertEqual(results.names, f.names)
+            self.assertEqual((21, 2, 10), (len(f), f.every, f.start))
+            self.assertEqual(results, f)
+            self.assertEqual(results[-1], f[-1])
+            for name in results.names:
+                column = f.column(name)
+                self.assertEqual(list(results.column(name)), column.tolist())
+                column.release()
+            with self.assertRaises(IndexError):
+                f[21]
+
+    def test_write_snapshots(self):
+        m = systems.parse.parse(open("examples/hiring.txt").read())
+        results = m.run(rounds=20)
+        self.write(results, every=5)
+        with open(self.path, 'rb') as fin:
+            expected = fin.read()
+
+        chunk = systems.columnar.CHUNK
+        systems.columnar.CHUNK = 2
+        try:
+            with open(self.path, 'wb') as fout:
+                systems.columnar.write_snapshots(m.iter_run(rounds=20), 21, fout, every=5)
+            with open(self.path, 'rb') as fin:
+                self.assertEqual(expected, fin.read())
+
+            for rounds in (20, 22):
+                with open(self.path, 'wb') as fout:
+                    with self.assertRaises(ValueError):
+                        systems.columnar.write_snapshots(m.iter_run(rounds=20), rounds, fout)
+        finally:
+            systems.columnar.CHUNK = chunk
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_numpy_memmap(self):
+        m = systems.parse.parse(open("examples/hiring.txt").read())
+        results = m.run(rounds=5)
+        self.write(results)
+        with ColumnarFile(self.path) as f:
+            offset = systems.columnar.read_header(f.mmap)['offset']
+        values = numpy.memmap(self.path, dtype='<f8', mode='r', offset=offset,
+                              shape=(len(results.names), len(results)))
+        self.assertEqual(list(results.column('Onsites')), values[results.index['Onsites']].tolist())
+        del values
+
+    def test_invalid(self):
+        m = systems.parse.parse("a(3) > b @ 1")
+        self.write(m.run(rounds=5))
+        with open(self.path, 'rb') as fin:
+            data = fin.read()
+        for invalid in (b'', b'nonsense', data[:40], data[:-1]):
+            with open(self.path, 'wb') as fout:
+                fout.write(invalid)
+            with self.assertRaises(InvalidColumnarFile):
+                ColumnarFile(self.path)
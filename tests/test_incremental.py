@@ -0,0 +1,53 @@
+"Test incremental.py"
+import unittest
+
+import systems.models
+import systems.parse
+from systems.incremental import Incremental
+
+
+class TestIncremental(unittest.TestCase):
+    def test_rerun(self):
+        m = systems.parse.parse(open("examples/hiring.txt").read())
+        inc = Incremental(m)
+        self.assertEqual(m.run(rounds=20), inc.run(rounds=20))
+        self.assertEqual(None, inc.affected)
+
+        # only stocks downstream of the edited flow are recomputed
+        offers = [f for f in m.flows if f.source.name == 'Offers'][0]
+        offers.rate.formula = systems.models.Formula(0.8)
+        m.changed()
+        results = inc.run(rounds=20)
+        self.assertEqual({'Offers', 'Hires', 'Employees', 'Departures', 'Departed'}, inc.affected)
+        self.assertEqual(m.run(rounds=20), results)
+
+        # maximums affect the flows into the stock
+        m.get_stock('Onsites').maximum = systems.models.Formula(6)
+        results = inc.run(rounds=20)
+        self.assertNotIn('Candidates', inc.affected)
+        self.assertIn('PhoneScreens', inc.affected)
+        self.assertEqual(m.run(rounds=20), results)
+
+        # unchanged models reuse every column
+        self.assertIs(results, inc.run(rounds=20))
+        self.assertEqual(set(), inc.affected)
+
+    def test_initial_references(self):
+        m = systems.parse.parse("a(5)\nb(a * 2)\nc(3) > d @ 1")
+        inc = Incremental(m)
+        inc.run(rounds=5)
+        m.get_stock('a').initial = systems.models.Formula(7)
+        results = inc.run(rounds=5)
+        self.assertEqual({'a', 'b'}, inc.affected)
+        self.assertEqual(m.run(rounds=5), results)
+
+    def test_structure_changes(self):
+        m = systems.parse.parse("a(5) > b @ 1")
+        inc = Incremental(m)
+        inc.run(rounds=5)
+        systems.parse.parse_flow(m, m.get_stock('b'), m.stock('c'), "2")
+        results = inc.run(rounds=5)
+        self.assertEqual(None, inc.affected)
+        self.assertEqual(m.run(rounds=5), results)
+        inc.run(rounds=6)
+        self.assertEqual(None, inc.affected)
@@ -0,0 +1,83 @@
+"Test lexer.py"
+import unittest
+
+import systems.lexer as lexer
+from systems.errors import IllegalStockName
+
+
+class TestLexer(unittest.TestCase):
+    def test_lex(self):
+        txt = "# comment\n\n[a] > b(1, 10) @ Leak(0.5)\nb > c @ b / (c+1)\nd"
+        expected = (lexer.TOKEN_LINES, [
+            (lexer.TOKEN_LINE, 1, [(lexer.TOKEN_COMMENT, '# comment')]),
+            (lexer.TOKEN_LINE, 3, [
+                (lexer.TOKEN_STOCK_INFINITE, 'a', (lexer.TOKEN_PARAMS, [])),
+                (lexer.TOKEN_FLOW_DIRECTION, '>'),
+                (lexer.TOKEN_STOCK, 'b', (lexer.TOKEN_PARAMS, (
+                    (lexer.TOKEN_FORMULA, [(lexer.TOKEN_WHOLE, '1')]),
+                    (lexer.TOKEN_FORMULA, [(lexer.TOKEN_WHOLE, '10')])))),
+                (lexer.TOKEN_FLOW_DELIMITER, '@'),
+                (lexer.TOKEN_FLOW, 'Leak', (lexer.TOKEN_PARAMS, (
+                    (lexer.TOKEN_FORMULA, [(lexer.TOKEN_DECIMAL, '0.5')]),)))]),
+            (lexer.TOKEN_LINE, 4, [
+                (lexer.TOKEN_STOCK, 'b', (lexer.TOKEN_PARAMS, ())),
+                (lexer.TOKEN_FLOW_DIRECTION, '>'),
+                (lexer.TOKEN_STOCK, 'c', (lexer.TOKEN_PARAMS, ())),
+                (lexer.TOKEN_FLOW_DELIMITER, '@'),
+                (lexer.TOKEN_FLOW, '', (lexer.TOKEN_PARAMS, (
+                    (lexer.TOKEN_FORMULA, [
+                        (lexer.TOKEN_REFERENCE, 'b'),
+                        (lexer.TOKEN_OP, '/'),
+                        (lexer.TOKEN_FORMULA, [
+                            (lexer.TOKEN_REFERENCE, 'c'),
+                            (lexer.TOKEN_OP, '+'),
+                            (lexer.TOKEN_WHOLE, '1')])]),)))]),
+            (lexer.TOKEN_LINE, 5, [(lexer.TOKEN_STOCK, 'd', (lexer.TOKEN_PARAMS, ()))]),
+        ])
+        self.assertEqual(expected, lexer.lex(txt))
+
+    def test_comments(self):
+        cases = [
+            ("  # a comment", "# a comment"),
+            ("a # b > c @ 1", "a# b > c @ 1"),
+        ]
+        for txt, comment in cases:
+            _, lines = lexer.lex(txt)
+            self.assertEqual([(lexer.TOKEN_LINE, 1, [(lexer.TOKEN_COMMENT, comment)])], lines)
+
+    def test_missing_stock(self):
+        for txt in [" > b @ 1", "a > @ 1"]:
+            with self.assertRaises(IllegalStockName):
+                lexer.lex(txt)
+
+    def test_lex_formula(self):
+        cases = [
+            ("", []),
+            ("5", [(lexer.TOKEN_WHOLE, '5')]),
+            (" inf ", [(lexer.TOKEN_INFINITY, 'inf')]),
+            ("a*-2", [(lexer.TOKEN_REFERENCE, 'a'), (lexer.TOKEN_OP, '*'),
+                      (lexer.TOKEN_OP, '-'), (lexer.TOKEN_WHOLE, '2')]),
+            ("(a)", [(lexer.TOKEN_FORMULA, [(lexer.TOKEN_REFERENCE, 'a')])]),
+        ]
+        for txt, tokens in cases:
+            self.assertEqual((lexer.TOKEN_FORMULA, tokens), lexer.lex_formula(txt))
+
+    def test_lex_formula_cache(self):
+        lexer.lex_formula.cache_clear()
+        first = lexer.lex_formula("a * (b + 2)")
+        second = lexer.lex_formula("a * (b + 2)")
+        self.assertIs(first, second)
+        info = lexer.lex_formula.cache_info()
+        self.assertEqual(1, info.hits)
+        self.assertEqual(1, info.misses)
+        self.assertEqual(lexer.FORMULA_CACHE_SIZE, info.maxsize)
+
+    def test_lex_lines(self):
+        txt = "# comment\n\n[a] > b @ 1\nb > c @ 0.5\n"
+        lines = lexer.lex_lines(txt.splitlines(keepends=True))
+        self.assertEqual(lexer.lex(txt)[1], list(lines))
+        self.assertEqual([1, 3, 4], [n for _, n, _ in lexer.lex(txt)[1]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+"Test parallel.py"
+import unittest
+
+import systems.parallel
+import systems.parse
+
+
+SPEC = """
+Standalone(3)
+Recruiters(2)
+[CandidatesA] > ScreensA @ Recruiters * 5
+ScreensA > HiresA(0, 20) @ 0.5
+HiresA > DepartedA @ Leak(0.1)
+[CandidatesB] > ScreensB @ 7
+ScreensB > HiresB @ 0.25
+ScreensB > RejectedB @ 2
+[CandidatesC] > HiresC(1) @ 1
+"""
+
+
+class TestParallel(unittest.TestCase):
+    def test_divide(self):
+        schedule = [['a'], ['b', 'c', 'd'], ['e', 'f'], ['g']]
+        chunks = systems.parallel.divide(schedule, 2)
+        self.assertEqual([[['b', 'c', 'd'], ['g']], [['e', 'f'], ['a']]], chunks)
+        self.assertEqual(4, len(systems.parallel.divide(schedule, 10)))
+
+    def test_run(self):
+        m = systems.parse.parse(SPEC)
+        expected = m.run(rounds=15)
+        for processes in (1, 2, 3):
+            results = m.run(rounds=15, processes=processes)
+            self.assertEqual(expected.names, results.names)
+            self.assertEqual(expected, results)
+            self.assertEqual(m.render(expected), m.render(results))
+
+
+if __name__ == "__main__":
+    unittest.main()
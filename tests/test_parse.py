@@ -1,4 +1,5 @@
 "Test parse.py"
+import io
 import unittest
 
 import systems.parse as parse
@@ -156,6 +157,46 @@ class TestParse(unittest.TestCase):
         self.assertEqual(3, m.get_stock('c').initial.compute())
         self.assertEqual(5, m.get_stock('c').maximum.compute())
 
+    def test_stock_index(self):
+        txt = """
+        a > b @ 1
+        b(2, 5) > [c] @ 2
+        """
+        m = parse.parse(txt)
+        self.assertEqual(['a', 'b', 'c'], sorted(m.stocks_by_name))
+        for stock in m.stocks:
+            self.assertIs(stock, m.get_stock(stock.name))
+        self.assertEqual(2, m.get_stock('b').initial.compute())
+        self.assertIsNone(m.get_stock('d'))
+
+    def test_parse_lines(self):
+        "Definitions can be parsed from files or other iterables of lines."
+        expected = parse.parse(EXAMPLE_FULL).run(rounds=5)
+        self.assertEqual(expected, parse.parse(io.StringIO(EXAMPLE_FULL)).run(rounds=5))
+        self.assertEqual(expected, parse.parse(EXAMPLE_FULL.split("\n")).run(rounds=5))
+        with open("examples/hiring.txt") as fin:
+            m = parse.parse(fin)
+        self.assertEqual(parse.parse(open("examples/hiring.txt").read()).run(), m.run())
+
+        lines = iter(["a(1) > b @ 1\n", "\n", "b > c @ Unknown(1)\n", "never > read @ 1\n"])
+        with self.assertRaises(UnknownFlowType) as uft:
+            parse.parse(lines, tracebacks=False)
+        self.assertEqual(3, uft.exception.line_number)
+        # lines after the error aren't read
+        self.assertEqual(["never > read @ 1\n"], list(lines))
+
+    def test_lexer_errors(self):
+        "Errors lexing a line include its line number."
+        with self.assertRaises(ParseError) as pe:
+            parse.parse("a > b @ 1\nc > d @ 2\n1x > y @ 3", tracebacks=False)
+        self.assertEqual(3, pe.exception.line_number)
+        self.assertIsInstance(pe.exception.exception, systems.errors.IllegalStockName)
+        self.assertIn("line 3", str(pe.exception))
+
+        with self.assertRaises(ParseError) as pe:
+            parse.parse("a > b @ 1\nc > d @ Rate(1))x", tracebacks=False)
+        self.assertEqual(2, pe.exception.line_number)
+
 
 class TestParseStock(unittest.TestCase):
     "Test parsing stocks."
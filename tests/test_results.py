@@ -0,0 +1,79 @@
+"Test results.py"
+import unittest
+
+import systems.parse
+from systems.results import Results
+
+
+class TestResults(unittest.TestCase):
+    def test_snapshots(self):
+        results = Results(['a', 'b'])
+        rows = [{'a': 1, 'b': 0.5}, {'a': 2.5, 'b': 1}, {'a': 3, 'b': float('+inf')}]
+        for row in rows:
+            results.append(row)
+
+        self.assertEqual(3, len(results))
+        self.assertEqual(rows, results)
+        self.assertEqual(rows[-1], results[-1])
+        self.assertEqual(rows[1:], results[1:])
+        self.assertEqual(rows, list(results))
+        self.assertEqual(repr(rows), repr(results))
+        # integers are returned as integers after a column holds floats
+        self.assertIs(int, type(results[2]['a']))
+        self.assertIs(float, type(results[0]['b']))
+        self.assertIs(int, type(results[1]['b']))
+
+        with self.assertRaises(IndexError):
+            results[3]
+
+        self.assertEqual([1, 2.5, 3], list(results.columns[0]))
+        self.assertEqual([int, float, int], [type(v) for v in results.columns[0]])
+
+    def test_columns(self):
+        results = Results(['a', 'b'])
+        for i in range(5):
+            results.append({'a': i, 'b': i / 2})
+        self.assertEqual('q', results.column('a').typecode)
+        self.assertEqual([0, 1, 2, 3, 4], list(results.column('a')))
+        self.assertEqual('d', results.column('b').typecode)
+        self.assertEqual([1.0, 1.5], list(results.column('b')[2:4]))
+
+    def test_large_integers(self):
+        "Integers too large to store exactly as floats are kept exact."
+        big = 2 ** 53 + 1
+        for values in ([0.5, 1, big, 2.5], [big, 0.5, 1], [2 ** 64, 0.5], [0.5, -2 ** 70]):
+            results = Results(['a'])
+            for value in values:
+                results.append({'a': value})
+            self.assertEqual(repr(values), repr(list(results.columns[0])))
+            self.assertEqual(values, [results[i]['a'] for i in range(len(values))])
+
+        spec = """
+        s0(1, s1 * 2)
+        s1(11, 13)
+        [Inf] > s0 @ 3
+        s0 > s1 @ 1
+        s0 > s1 @ 0.5
+        s1 > s0 @ 0.5
+        s0 > s1 @ Leak(0.3)
+        """
+        model = systems.parse.parse(spec)
+        results = model.run(rounds=20)
+        self.assertEqual(9816760615637007, results[14]['s1'])
+        self.assertEqual(repr(list(model.iter_run(rounds=20))), repr(results))
+
+    def test_from_columns(self):
+        results = Results.from_columns(['a', 'b'], [[1.0, 2.0], [3.0, 4.5]])
+        self.assertEqual([{'a': 1, 'b': 3}, {'a': 2, 'b': 4.5}], results)
+
+    def test_render(self):
+        model = systems.parse.parse(open("examples/hiring.txt").read())
+        results = model.run(rounds=5)
+        self.assertIsInstance(results, Results)
+        expected = list(model.iter_run(rounds=5))
+        self.assertEqual(model.render(expected), model.render(results))
+        self.assertEqual(model.render_html(expected), model.render_html(results))
+
+
+if __name__ == "__main__":
+    unittest.main()
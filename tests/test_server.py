@@ -0,0 +1,100 @@
+"Test server.py"
+import io
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+import systems.parse
+from systems.server import Server
+
+
+class TestServer(unittest.TestCase):
+    def requests(self, server, *requests):
+        out = io.StringIO()
+        lines = [r if isinstance(r, str) else json.dumps(r) for r in requests]
+        server.serve(lines, out)
+        return [json.loads(line) for line in out.getvalue().splitlines()]
+
+    def test_serve(self):
+        txt = open("examples/hiring.txt").read()
+        expected = systems.parse.parse(txt).run(rounds=5)
+        server = Server(size=1)
+
+        first, second, overridden = self.requests(
+            server,
+            {'id': 1, 'model': txt, 'rounds': 5},
+            {'id': 2, 'model': txt, 'rounds': 5},
+            {'id': 3, 'model': txt, 'rounds': 5, 'overrides': {'rates': {'Candidates > PhoneScreens': 10}}})
+        self.assertEqual(1, first['id'])
+        self.assertEqual(expected.names, first['names'])
+        self.assertEqual(expected, [dict(zip(first['names'], row)) for row in first['values']])
+        self.assertEqual(first['values'], second['values'])
+        self.assertEqual(10, overridden['values'][1][1])
+        self.assertEqual(1, len(server.models))
+
+        by_hash, = self.requests(server, {'id': 4, 'hash': first['hash'], 'rounds': 5})
+        self.assertEqual(first['values'], by_hash['values'])
+
+        # least recently used models are forgotten
+        self.requests(server, {'model': "a > b @ 1"})
+        unknown, = self.requests(server, {'id': 5, 'hash': first['hash']})
+        self.assertIn('UnknownModel', unknown['error'])
+
+    def test_errors(self):
+        server = Server()
+        responses = self.requests(
+            server,
+            "not json",
+            "[1, 2]",
+            {'id': 1},
+            {'id': 2, 'model': "a > b @ Unknown(1)"},
+            {'id': 3, 'model': "a > b @ 1", 'overrides': {'initial': {'c': 1}}},
+            {'id': 4, 'model': "a(1) > b @ 1 / 0"},
+            {'id': 5, 'model': "a(1) > b @ 1", 'overrides': {'initial': {'a': "1)"}}},
+            {'id': 6, 'model': "a(2) > b @ 1", 'rounds': 1})
+        self.assertEqual([None, None, 1, 2, 3, 4, 5, 6], [r['id'] for r in responses])
+        for response in responses[:-1]:
+            self.assertIn('error', response)
+        self.assertIn('ZeroDivisionError', responses[5]['error'])
+        self.assertEqual([[2, 0], [1, 1]], responses[-1]['values'])
+
+    def test_hash_paths(self):
+        directory = tempfile.mkdtemp()
+        victim = os.path.join(directory, 'victim.model')
+        with open(victim, 'w') as fout:
+            fout.write("not a model")
+        server = Server(cache_dir=os.path.join(directory, 'cache'))
+        responses = self.requests(
+            server,
+            {'id': 1, 'hash': "../victim"},
+            {'id': 2, 'hash': "A" * 64},
+            {'id': 3, 'hash': 1})
+        for response in responses:
+            self.assertIn('hash must be', response['error'])
+        self.assertTrue(os.path.exists(victim))
+        os.remove(victim)
+        os.rmdir(directory)
+
+    @unittest.skipUnless(hasattr(socket, 'AF_UNIX'), "requires unix sockets")
+    def test_socket(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'systems.sock')
+        listener = Server().listen(path)
+        thread = threading.Thread(target=listener.serve_forever)
+        thread.start()
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.connect(path)
+                client.sendall(b'{"id": 1, "model": "a(2) > b @ 1", "rounds": 1}\n')
+                client.shutdown(socket.SHUT_WR)
+                response = json.loads(client.makefile().readline())
+            self.assertEqual([[2, 0], [1, 1]], response['values'])
+        finally:
+            listener.shutdown()
+            listener.server_close()
+            thread.join()
+            os.remove(path)
+            os.rmdir(directory)
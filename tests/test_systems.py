@@ -1,7 +1,10 @@
 "Test systems.py"
+import io
+import pickle
 import unittest
 
 from systems.errors import IllegalSourceStock
+import systems.errors
 import systems.models
 import systems.parse
 import systems.lexer
@@ -120,6 +123,130 @@ class TestModels(unittest.TestCase):
         self.assertEqual(12, final['b'])
         self.assertEqual(6, final['c'])
 
+    def test_iter_run(self):
+        m = systems.parse.parse(open("examples/hiring.txt").read())
+        results = m.run(rounds=10)
+        self.assertEqual(results, list(m.iter_run(rounds=10)))
+        self.assertEqual(results[::5], list(m.iter_run(rounds=10, every=5)))
+        for every in (0, -1):
+            with self.assertRaises(ValueError):
+                m.iter_run(rounds=10, every=every)
+
+        projected = list(m.iter_run(rounds=10, stocks=['Employees']))
+        self.assertEqual([{'Employees': r['Employees']} for r in results], projected)
+
+        self.assertEqual(m.render(results), m.render(m.iter_run(rounds=10)))
+        rendered = m.render(m.iter_run(rounds=10, every=5), sep=',', pad=False, every=5)
+        self.assertEqual(['', '0', '5', '10'], [line.split(',')[0] for line in rendered.split('\n')])
+
+    def test_render_without_shown_stocks(self):
+        m = systems.parse.parse("[a] > [b] @ 1")
+        results = m.run(rounds=2)
+        self.assertEqual('\t\n0\n1\n2', m.render(results))
+        self.assertEqual(m.render(list(results)), m.render(results))
+        self.assertEqual(m.render_html(list(results)), m.render_html(results))
+        self.assertEqual(3, m.render_html(results).count("<tr><td>"))
+
+    def test_write(self):
+        m = systems.parse.parse(open("examples/hiring.txt").read())
+        results = m.run(rounds=10)
+        for kwargs in ({}, {'sep': ',', 'pad': False}, {'pad': False, 'every': 5, 'start': 10}):
+            out = io.StringIO()
+            m.write(results, out, **kwargs)
+            self.assertEqual(m.render(results, **kwargs) + "\n", out.getvalue())
+            self.assertEqual(m.render(results, **kwargs), m.render(list(results), **kwargs))
+
+        out = io.StringIO()
+        m.write_html(results, out)
+        self.assertEqual(m.render_html(results) + "\n", out.getvalue())
+        self.assertEqual(m.render_html(results), m.render_html(list(results)))
+        self.assertIn("<tr><td>1</td><td>25</td><td>0</td>", out.getvalue())
+
+    def test_run_until_steady(self):
+        m = systems.parse.parse("a(10) > b @ 3")
+        results = m.run_until_steady(rounds=100)
+        # a drains into b by round 4, which round 5 repeats
+        self.assertEqual((4, 1), (results.steady, results.period))
+        self.assertEqual(6, len(results))
+        self.assertEqual(m.run(rounds=5), results)
+
+        # cycles between a and b every two rounds
+        m = systems.parse.parse("a(2) > b @ 2\nb > a @ 2")
+        results = m.run_until_steady(rounds=100)
+        self.assertEqual((0, 2), (results.steady, results.period))
+        self.assertEqual([{'a': 2, 'b': 0}, {'a': 0, 'b': 2}, {'a': 2, 'b': 0}], results)
+
+        # grows forever, but more slowly than tolerance
+        m = systems.parse.parse("a(1) > b @ Leak(0.5)\n[c] > a @ Rate(0.001)")
+        results = m.run_until_steady(rounds=20)
+        self.assertEqual(None, results.steady)
+        self.assertEqual(21, len(results))
+        results = m.run_until_steady(rounds=20, tolerance=0.01)
+        self.assertEqual(1, results.period)
+
+    def test_state_validates(self):
+        "State validates its model, so unvalidated models still advance."
+        m = systems.parse.parse("a(5) > b @ 1")
+        s = systems.models.State(m)
+        s.advance()
+        s.advance()
+        self.assertEqual({'a': 3, 'b': 2}, s.state)
+
+        m = systems.parse.parse("a(b) > b(a) @ 1")
+        with self.assertRaises(systems.errors.CircularReferences):
+            systems.models.State(m)
+
+    def test_advance_buffers(self):
+        "State reuses its steps and pending buffer every round."
+        m = systems.parse.parse(open("examples/hiring.txt").read())
+        s = systems.models.State(m)
+        steps, pending = s.steps, s.pending
+        self.assertEqual(len(m.flows), len(pending))
+        other = systems.models.State(m)
+        for i in range(5):
+            s.advance()
+            other.advance()
+            self.assertEqual(other.state, s.state)
+        self.assertEqual(m.run(rounds=5)[-1], s.state)
+        self.assertIs(steps, s.steps)
+        self.assertIs(pending, s.pending)
+
+    def test_slots(self):
+        m = systems.models.Model("Slots")
+        a = m.stock("a", systems.models.Formula(5))
+        b = m.stock("b")
+        flow = m.flow(a, b, systems.models.Rate(1))
+        objs = [a, flow, flow.rate, a.initial, systems.models.Conversion(0.5), systems.models.Leak(0.5)]
+        for obj in objs:
+            self.assertFalse(hasattr(obj, '__dict__'), obj)
+
+        restored = pickle.loads(pickle.dumps(a))
+        self.assertEqual(("a", 5, None), (restored.name, restored.initial.compute(), restored.model))
+
+    def test_validation_cache(self):
+        "Models are only validated again after they change."
+        m = systems.models.Model("Validation")
+        a = m.stock("a", systems.models.Formula(5))
+        b = m.stock("b")
+        m.flow(a, b, systems.models.Rate(1))
+        m.run(rounds=1)
+        self.assertEqual(m.version, m.validated)
+
+        schedule = m.schedule
+        m.run(rounds=2)
+        self.assertIs(schedule, m.schedule)
+
+        b.initial = systems.models.Formula("c")
+        with self.assertRaises(systems.errors.InvalidFormula):
+            m.run(rounds=1)
+        with self.assertRaises(systems.errors.InvalidFormula):
+            m.run(rounds=1)
+
+        b.initial = systems.models.Formula("a")
+        self.assertEqual(5, m.run(rounds=1)[0]['b'])
+        b.maximum = systems.models.Formula(7)
+        self.assertEqual(7, m.run(rounds=5)[-1]['b'])
+
 
 class TestFormula(unittest.TestCase):
     def test_simple_formulas(self):
@@ -156,6 +283,72 @@ class TestFormula(unittest.TestCase):
             formula = systems.models.Formula(lexed)
             self.assertEqual(case_out, formula.compute(state))
 
+    def test_compiled_formulas(self):
+        state = {'a': 10, 'b': 5, 'c': 0}
+        cases = [
+            ("a + b * 2", 30),
+            ("a - b - 5", 0),
+            ("a / b / 2", 1),
+            ("a / (b * 2)", 1),
+            ("c * 10", 0),
+        ]
+        for case_in, case_out in cases:
+            lexed = systems.lexer.lex_formula(case_in)
+            formula = systems.models.Formula(lexed, default=7)
+            expected = case_out if case_out else 7
+            self.assertEqual(expected, formula.compute(state))
+            self.assertEqual(expected, formula.compute(state))
+
+    def test_long_formulas(self):
+        "Formulas with thousands of terms don't recurse once per term."
+        n = 5000
+        self.assertEqual(n, systems.models.Formula(" + ".join(["1"] * n)).compute())
+
+        stocks = ["s%d(1)" % i for i in range(n)]
+        total = "Total(%s)" % " + ".join("s%d" % i for i in range(n))
+        m = systems.parse.parse("\n".join(stocks + [total]))
+        self.assertEqual(n, m.run(rounds=1)[-1]['Total'])
+
+    def test_nested_formulas(self):
+        formula = systems.models.Formula("a / ((b + 1) * (c + 1))")
+        self.assertEqual(1, len(formula.children))
+        self.assertEqual(2, len(formula.children[0].children))
+        self.assertEqual(['a', 'b', 'c'], sorted(formula.references()))
+        self.assertEqual(2, formula.compute({'a': 12, 'b': 2, 'c': 1}))
+
+    def test_constant_formulas(self):
+        constant = systems.models.Formula("(2 + 3) * 4")
+        self.assertTrue(constant.constant)
+        self.assertEqual(20, constant.value)
+        self.assertEqual(20, constant.compute({'a': 1}))
+
+        self.assertFalse(systems.models.Formula("a * 2").constant)
+        self.assertFalse(systems.models.Formula("(a + 1) * 2").constant)
+        # errors are still raised when computed rather than when created
+        zero = systems.models.Formula("1 / 0")
+        self.assertFalse(zero.constant)
+        with self.assertRaises(ZeroDivisionError):
+            zero.compute()
+
+    def test_flow_capacity(self):
+        m = systems.models.Model("Capacity")
+        a = m.stock("a", systems.models.Formula(10))
+        b = m.stock("b", systems.models.Formula(0), systems.models.Formula("c * 2"))
+        c = m.stock("c", systems.models.Formula(2))
+        flow = m.flow(a, b, systems.models.Rate(1))
+        self.assertEqual(4, flow.capacity({'a': 10, 'b': 0, 'c': 2}))
+        self.assertEqual(4, flow.capacity({'a': 5, 'b': 3, 'c': 2}))
+        self.assertEqual(6, flow.capacity({'a': 5, 'b': 3, 'c': 3}))
+
+        # replaced maximums are picked up when the model is validated
+        b.maximum = systems.models.Formula(1)
+        m.validate()
+        self.assertEqual(1, flow.capacity({'a': 10, 'b': 0, 'c': 2}))
+
+    def test_invalid_nested_formula(self):
+        with self.assertRaises(systems.errors.InvalidFormula):
+            systems.models.Formula("a * (b +)")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,99 @@
+"Test vectorized.py"
+import unittest
+
+import systems.models
+import systems.parse
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+SPECS = [
+    """
+    [Candidates] > PhoneScreens @ 25
+    PhoneScreens > Onsites      @ 0.5
+    Onsites      > Offers       @ 0.5
+    Offers       > Hires        @ 0.5
+    Hires        > Employees(5) @ 1.0
+    Employees    > Departures   @ Leak(0.1)
+    Departures   > [Departed]   @ 1.0
+    """,
+    """
+    [Hires] > Developers @ 1
+    [Ideas] > Projects   @ Developers / (Projects+1)
+    Projects > Started   @ Developers - (Started+1)
+    Started > Finished   @ Developers
+    """,
+    """
+    [a] > b @ 10
+    b(0, 5) > c(0, 10) @ 5
+    c > d(0, c * 2) @ Conversion(0.5)
+    b > e(3, 7) @ Leak(0.3)
+    """,
+    """
+    a(10) > b @ 3
+    a > c @ 2.5
+    b > c @ Leak(0.25)
+    c > a @ 1
+    """,
+    """
+    [Supply] > Source(20) @ 7
+    Source > a @ 4
+    Source > b(0, 3) @ 2.5
+    Source > c @ Leak(0.2)
+    Source > d @ Conversion(0.5)
+    Source > e @ Rate(a)
+    a > Source @ 1
+    Source > f @ 6
+    """,
+]
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestVectorized(unittest.TestCase):
+    def test_matches_reference(self):
+        for spec in SPECS:
+            model = systems.parse.parse(spec)
+            expected = model.run(rounds=20)
+            results = model.run(rounds=20, engine="numpy")
+            self.assertEqual(expected, results)
+
+    def test_fanout_levels(self):
+        "Flows removing from the same source share a level."
+        import systems.vectorized
+        model = systems.parse.parse(SPECS[-1])
+        model.validate()
+        names = [s.name for s in model.stocks]
+        state = numpy.zeros((1, len(names)))
+        plan = systems.vectorized.Plan([model], names, state)
+        # Rate(a) must wait for a to be removed from, so it and the
+        # flows declared before it are in the next level
+        self.assertEqual([3, 5], [len(level.positions) for level in plan.levels])
+        self.assertEqual([0, 1], [len(level.chains) for level in plan.levels])
+
+    def test_long_formulas(self):
+        n = 5000
+        total = " + ".join("s%d" % i for i in range(n))
+        stocks = ["s%d(1)" % i for i in range(n)]
+        model = systems.parse.parse("\n".join(stocks + ["[a] > b @ %s" % total]))
+        self.assertEqual(n, model.run(rounds=1, engine="numpy")[-1]['b'])
+
+    def test_division_by_zero(self):
+        "Dividing by zero raises as in the python engine, rather than returning inf."
+        for spec in ["a(5) > b @ 1 / (b - b)", "a(5) > b(0, 10) @ Conversion(b)"]:
+            model = systems.parse.parse(spec)
+            with self.assertRaises(ZeroDivisionError):
+                model.run(rounds=2)
+            with self.assertRaises(ZeroDivisionError):
+                model.run(rounds=2, engine="numpy")
+
+    def test_unknown_engine(self):
+        model = systems.parse.parse(SPECS[0])
+        with self.assertRaises(systems.errors.UnknownEngine):
+            model.run(engine="fortran")
+
+
+if __name__ == "__main__":
+    unittest.main()